@@ -1,19 +1,42 @@
 # api/app.py
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from api.routers import products, categories, favorites, orders, auth, seller
+from api.common.pagination import NEXT_CURSOR_HEADER
+from api.common.static import MediaFiles
+from api.common.uploads import MAX_IMAGE_BYTES, MULTIPART_OVERHEAD_BYTES, UploadSizeLimit
+from api.routers import products, categories, favorites, orders, auth, seller, media, metrics
+from api.security import warm_revoked_tokens
 
-app = FastAPI(title="Marketplace API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # no request is authenticated before the token revocation snapshot is
+    # built; if the database is down at boot, it is retried in the background
+    await run_in_threadpool(warm_revoked_tokens)
+    yield
+
+
+app = FastAPI(title="Marketplace API", lifespan=lifespan)
+# reject oversized image uploads before Starlette spools the multipart body
+app.add_middleware(
+    UploadSizeLimit,
+    paths=r"^/seller/products/\d+/images$",
+    max_body=MAX_IMAGE_BYTES + MULTIPART_OVERHEAD_BYTES,
+)
 
 # --- CORS AYARLARI ---
 # Eğer .env içinde FRONTEND_ORIGINS değişkeni varsa (virgülle ayrılmış URL listesi)
 # Örn: FRONTEND_ORIGINS=http://localhost:3000,https://myapp.vercel.app
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MEDIA_DIR = os.path.join(BASE_DIR, "backend", "media")
-app.mount("/media", StaticFiles(directory=MEDIA_DIR), name="media")
+# /media/resize/... must be matched before the catch-all /media mount
+app.include_router(media.router)
+# cache headers, ETags, WebP/precompressed variants: see api/common/static.py
+app.mount("/media", MediaFiles(directory=MEDIA_DIR), name="media")
 
 origins_env = os.getenv("FRONTEND_ORIGINS")
 
@@ -29,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # --- ROUTERS ---
@@ -38,3 +62,4 @@ app.include_router(categories.router)
 app.include_router(favorites.router)
 app.include_router(orders.router)
 app.include_router(seller.router)
+app.include_router(metrics.router)
@@ -0,0 +1,71 @@
+# api/bench_startup.py — How long a FastAPI worker takes to import, and its RSS
+"""
+Usage (from the repo root, with the API's environment set)::
+
+    python -m api.bench_startup [--runs 5]
+
+Each run is a fresh interpreter, so nothing is shared between samples.
+``api`` imports the application the way uvicorn does; ``api+django`` does
+the same and then boots Django from ``backend.core.settings``, which is
+what every worker used to do just to hash passwords.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, time
+t0 = time.perf_counter()
+import api.app
+if {django}:
+    import os, django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.core.settings")
+    django.setup()
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(__import__("sys").modules),
+}}))
+"""
+
+
+def sample(django: bool) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(django=django)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for label, django in (("api", False), ("api+django", True)):
+        runs = [sample(django) for _ in range(args.runs)]
+        results[label] = {
+            "seconds": statistics.median(r["seconds"] for r in runs),
+            "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+            "modules": runs[-1]["modules"],
+        }
+        print(
+            f"{label:<11} import {results[label]['seconds'] * 1000:7.0f} ms  "
+            f"max RSS {results[label]['rss_mb']:6.1f} MB  "
+            f"{results[label]['modules']:5d} modules  (median of {args.runs})"
+        )
+    base, full = results["api"], results["api+django"]
+    print(
+        f"saved       {(full['seconds'] - base['seconds']) * 1000:7.0f} ms  "
+        f"        {full['rss_mb'] - base['rss_mb']:6.1f} MB  "
+        f"{full['modules'] - base['modules']:5d} modules"
+    )
+
+
+if __name__ == "__main__":
+    main()
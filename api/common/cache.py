@@ -0,0 +1,254 @@
+# api/common/cache.py
+"""Small in-process caches shared by the routers."""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU with a per-entry time to live.
+
+    Sync routes run in Starlette's threadpool, so every access takes the lock.
+    The cache is per worker process: writes invalidate the local copy and the
+    TTL bounds how long other workers can serve a stale entry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VersionedSnapshot:
+    """
+    One value rebuilt whenever its source version changes, served
+    stale-while-revalidate.
+
+    ``load_version()`` is a cheap read (e.g. a counter row) and ``build()`` the
+    expensive rebuild. Only the very first ``get()`` builds inline; after that
+    a request that finds the snapshot older than ``check_interval`` starts a
+    single background refresh and is answered from the current value.
+    ``peek()`` never builds inline, so it is safe on the event loop.
+    """
+
+    def __init__(
+        self,
+        load_version: Callable[[], Any],
+        build: Callable[[], Any],
+        check_interval: float = 5.0,
+    ):
+        self._load_version = load_version
+        self._build = build
+        self.check_interval = check_interval
+        self._state: Optional[tuple[Any, Any]] = None  # (version, value)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()  # held by whoever is refreshing
+
+    def get(self) -> Any:
+        state = self._state
+        if state is None:
+            with self._lock:
+                if self._state is None:
+                    self._refresh()
+                return self._state[1]
+
+        stale = time.monotonic() - self._checked_at >= self.check_interval
+        if stale and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return state[1]
+
+    def peek(self, default: Any = None) -> Any:
+        """
+        Like ``get()``, but the first build runs in the background too and
+        ``default`` is returned until it has succeeded. A failed build is
+        retried after ``check_interval``.
+        """
+        state = self._state
+        stale = time.monotonic() - self._checked_at >= self.check_interval
+        if stale and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return default if state is None else state[1]
+
+    def invalidate(self) -> None:
+        """Make the next ``get()`` re-check the version."""
+        self._checked_at = 0.0
+
+    def refresh(self) -> None:
+        """Re-check the version now, in the calling thread (e.g. after a local write)."""
+        with self._lock:
+            self._refresh()
+
+    def _background_refresh(self) -> None:
+        try:
+            self._refresh()
+        except Exception:
+            logger.exception("Background snapshot refresh failed")
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def _refresh(self) -> None:
+        version = self._load_version()
+        if self._state is None or self._state[0] != version:
+            self._state = (version, self._build())
+        self._checked_at = time.monotonic()
+
+
+class DiskLRUCache:
+    """
+    Files under ``directory`` kept within ``max_bytes``, least recently used
+    evicted first.
+
+    Used from async routes; every filesystem call (the index rebuild, the
+    touch on a hit, evictions) runs in the threadpool, and the in-memory
+    index is guarded by a lock. ``get_or_create`` collapses concurrent misses
+    for a key onto one producer, so a cold popular key is rendered once, not
+    once per request. The index lives in this process and is rebuilt from
+    the directory (oldest mtime first) on first use; hits touch the file so
+    the order survives a restart. Several workers sharing the directory each
+    enforce the budget on what they know about, and a file another worker
+    evicted is simply a miss.
+    """
+
+    def __init__(self, directory, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: "Optional[OrderedDict[str, int]]" = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "asyncio.Task[Path]"] = {}
+
+    def path_for(self, key: str, suffix: str = "") -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}{suffix}"
+
+    def _load(self) -> "OrderedDict[str, int]":
+        # callers hold self._lock
+        if self._index is None:
+            entries = []
+            for dirpath, _, filenames in os.walk(self.directory):
+                for name in filenames:
+                    full = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(full)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, full, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((full, size) for _, full, size in entries)
+            self._total = sum(self._index.values())
+        return self._index
+
+    def _lookup(self, path: Path) -> Optional[Path]:
+        with self._lock:
+            index = self._load()
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= index.pop(str(path), 0)
+            return None
+        if str(path) not in index:
+            # written by another worker
+            self._add(path)
+        with self._lock:
+            if str(path) in index:
+                index.move_to_end(str(path))
+        return path
+
+    async def get(self, key: str, suffix: str = "") -> Optional[Path]:
+        return await run_in_threadpool(self._lookup, self.path_for(key, suffix))
+
+    def _add(self, path: Path) -> None:
+        size = path.stat().st_size
+        victims = []
+        with self._lock:
+            index = self._load()
+            self._total -= index.pop(str(path), 0)
+            index[str(path)] = size
+            self._total += size
+            while self._total > self.max_bytes and len(index) > 1:
+                victim, victim_size = index.popitem(last=False)
+                self._total -= victim_size
+                victims.append(victim)
+        for victim in victims:
+            try:
+                os.unlink(victim)
+            except FileNotFoundError:
+                pass
+
+    async def _fill(
+        self, path: Path, produce: Callable[[Path], Awaitable[None]]
+    ) -> Path:
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        await produce(path)
+        await run_in_threadpool(self._add, path)
+        return path
+
+    def _forget(self, key: str, task: "asyncio.Task[Path]") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # callers re-raise it; don't warn if they all left
+
+    async def get_or_create(
+        self, key: str, produce: Callable[[Path], Awaitable[None]], suffix: str = ""
+    ) -> Path:
+        """
+        Cached path for ``key``; on a miss ``await produce(path)`` must write
+        it (atomically). Concurrent callers for the same key share one task,
+        which also outlives a caller that disconnects.
+        """
+        path = await self.get(key, suffix)
+        if path is not None:
+            return path
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(self.path_for(key, suffix), produce))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
@@ -0,0 +1,89 @@
+# api/common/executor.py
+"""Bounded worker pools for CPU-heavy calls made from async routes."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class Overloaded(Exception):
+    """The pool is full, or the call waited too long to start; shed it."""
+
+
+class BoundedExecutor:
+    """
+    A dedicated thread pool with admission control and timing stats.
+
+    At most ``workers + max_queue`` calls are admitted; beyond that ``run``
+    raises ``Overloaded`` immediately instead of queueing. A call that sat in
+    the queue longer than ``max_wait`` seconds is dropped when it reaches a
+    worker (its client has most likely given up) rather than burning CPU.
+    Being separate from Starlette's threadpool, a burst here never takes
+    threads away from other endpoints.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "expired": 0,
+            "in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+            "run_seconds_max": 0.0,
+            "completed": 0,
+        }
+
+    def _record(self, **values: float) -> None:
+        with self._lock:
+            for key, value in values.items():
+                if key.endswith("_max"):
+                    self._stats[key] = max(self._stats[key], value)
+                else:
+                    self._stats[key] += value
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            self._record(rejected=1)
+            raise Overloaded(self.name)
+        self._record(admitted=1, in_flight=1)
+        enqueued = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            waited = started - enqueued
+            self._record(wait_seconds_total=waited, wait_seconds_max=waited)
+            if waited > self.max_wait:
+                self._record(expired=1)
+                raise Overloaded(self.name)
+            try:
+                return fn(*args)
+            finally:
+                took = time.perf_counter() - started
+                self._record(run_seconds_total=took, run_seconds_max=took, completed=1)
+
+        future = self._pool.submit(call)
+        # free the slot when the work is really done, even if our caller is cancelled
+        future.add_done_callback(lambda _: (self._slots.release(), self._record(in_flight=-1)))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        started = stats["completed"] + stats["expired"]
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / started if started else 0.0
+        stats["run_seconds_avg"] = (
+            stats["run_seconds_total"] / stats["completed"] if stats["completed"] else 0.0
+        )
+        stats.update(name=self.name, workers=self.workers, max_queue=self.max_queue)
+        return stats
@@ -0,0 +1,57 @@
+# api/common/pagination.py
+"""Opaque keyset cursors shared by list endpoints.
+
+A cursor is the sort key of the last row a client has seen, JSON encoded and
+wrapped in URL-safe base64 so clients treat it as an opaque token. The next
+page is then fetched with a ``WHERE key < :last`` predicate that walks the
+index instead of scanning and discarding ``OFFSET`` rows.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(**keys: Any) -> str:
+    raw = json.dumps(keys, separators=(",", ":"), sort_keys=True, default=str)
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, **fields: type) -> Dict[str, Any]:
+    """
+    Decode a cursor and check it carries ``fields`` with the given types,
+    e.g. ``decode_cursor(c, rank=float, id=int)``.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    for name, kind in fields.items():
+        value = data.get(name)
+        # ints are valid floats in JSON; bools are never valid keys
+        ok = isinstance(value, (int, float) if kind is float else kind)
+        if not ok or isinstance(value, bool):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return data
+
+
+def decode_id_cursor(cursor: str) -> int:
+    return decode_cursor(cursor, id=int)["id"]
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], bool]:
+    """Rows are fetched with ``limit + 1``; the extra row only signals more."""
+    return list(rows[:limit]), len(rows) > limit
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,85 @@
+# api/common/passwords.py
+"""
+Django-compatible password hashing without importing Django.
+
+Reads and writes ``auth_user.password`` in Django's ``<algorithm>$...``
+formats, so users can keep logging in to both the admin and the API:
+
+* ``pbkdf2_sha256$<iterations>$<salt>$<b64 hash>`` (Django's default; what
+  ``make_password`` produces),
+* ``pbkdf2_sha1$...`` and ``scrypt$<n>$<salt>$<r>$<p>$<b64 hash>``.
+
+Hashes from hashers that need extra libraries (argon2, bcrypt) never
+verify here; ``needs_rehash`` flags anything that is not current PBKDF2 so
+logins move users onto it. Keep ``PBKDF2_ITERATIONS`` in step with the
+Django version in requirements.txt.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import secrets
+import string
+
+logger = logging.getLogger(__name__)
+
+PBKDF2_ALGORITHM = "pbkdf2_sha256"
+PBKDF2_ITERATIONS = 1_000_000  # django.contrib.auth.hashers, Django 5.2
+UNUSABLE_PASSWORD_PREFIX = "!"  # set_unusable_password()
+SALT_CHARS = string.ascii_letters + string.digits
+SALT_LENGTH = 22  # ~128 bits, as Django's gen_salt()
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii").strip()
+
+
+def _pbkdf2(password: str, salt: str, iterations: int, digest: str) -> str:
+    raw = hashlib.pbkdf2_hmac(digest, password.encode(), salt.encode(), iterations)
+    return _b64(raw)
+
+
+def _scrypt(password: str, salt: str, n: int, r: int, p: int) -> str:
+    raw = hashlib.scrypt(
+        password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+        maxmem=128 * n * r * 2, dklen=64,
+    )
+    return _b64(raw)
+
+
+def make_password(password: str, salt: str | None = None) -> str:
+    """Same output as Django's ``make_password`` with default settings."""
+    salt = salt or "".join(secrets.choice(SALT_CHARS) for _ in range(SALT_LENGTH))
+    hashed = _pbkdf2(password, salt, PBKDF2_ITERATIONS, "sha256")
+    return f"{PBKDF2_ALGORITHM}${PBKDF2_ITERATIONS}${salt}${hashed}"
+
+
+def check_password(password: str, encoded: str | None) -> bool:
+    """Whether ``password`` matches an ``auth_user.password`` value."""
+    if password is None or not encoded or encoded.startswith(UNUSABLE_PASSWORD_PREFIX):
+        return False
+    algorithm, _, rest = encoded.partition("$")
+    try:
+        if algorithm in ("pbkdf2_sha256", "pbkdf2_sha1"):
+            iterations, salt, expected = rest.split("$", 2)
+            digest = "sha256" if algorithm == "pbkdf2_sha256" else "sha1"
+            actual = _pbkdf2(password, salt, int(iterations), digest)
+        elif algorithm == "scrypt":
+            n, salt, r, p, expected = rest.split("$", 4)
+            actual = _scrypt(password, salt, int(n), int(r), int(p))
+        else:
+            logger.warning("cannot verify %s password hashes without Django", algorithm)
+            return False
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual.encode(), expected.encode())
+
+
+def needs_rehash(encoded: str) -> bool:
+    """True unless ``encoded`` is PBKDF2-SHA256 at the current iteration count."""
+    algorithm, _, rest = encoded.partition("$")
+    if algorithm != PBKDF2_ALGORITHM:
+        return True
+    iterations, _, _ = rest.partition("$")
+    return iterations != str(PBKDF2_ITERATIONS)
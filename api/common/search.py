@@ -0,0 +1,45 @@
+# api/common/search.py
+"""
+Full-text product search.
+
+``catalog_product.search_vector`` is kept up to date by a database trigger
+(catalog migration 0003) and indexed with GIN, so matching is an index lookup
+instead of the old ``title ILIKE '%q%'`` sequential scan.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query
+
+from ..models.product import Product
+
+SEARCH_CONFIG = "simple"
+
+# Letters/digits only: everything else (tsquery operators included) separates terms
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def prefix_tsquery(q: str) -> Optional[str]:
+    """'silver ri' -> 'silver:* & ri:*' so search-as-you-type keeps matching."""
+    terms = _TERM_RE.findall(q.lower())
+    if not terms:
+        return None
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+def apply_search(query: Query, q: str):
+    """
+    Filter ``query`` by ``q`` and return ``(query, rank)``.
+
+    ``rank`` is a ``ts_rank`` expression callers can order by; it is ``None``
+    when ``q`` contains no searchable terms, in which case the query is
+    returned unchanged.
+    """
+    expr = prefix_tsquery(q)
+    if expr is None:
+        return query, None
+    tsquery = func.to_tsquery(SEARCH_CONFIG, expr)
+    rank = func.ts_rank(Product.search_vector, tsquery)
+    return query.filter(Product.search_vector.op("@@")(tsquery)), rank
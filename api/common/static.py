@@ -0,0 +1,121 @@
+"""
+``/media`` serving.
+
+Starlette's ``StaticFiles`` already streams files with byte ranges (and uses
+the ASGI ``pathsend`` extension, i.e. sendfile, where the server offers it),
+but sends no ``Cache-Control``, so browsers and CDNs revalidate product
+photos that can never change. ``MediaFiles`` adds:
+
+* ``Cache-Control: immutable`` for a year on content-named files
+  (``<sha256>``/``<uuid>`` names, see ``catalog.media``), with the name
+  itself as a strong ETag;
+* a WebP sibling (``<stem>.webp``) for JPEG/PNG requests when the client
+  accepts it, and ``.br``/``.gz`` precompressed copies for other types,
+  both with the matching ``Vary``;
+* ``If-None-Match`` taking precedence over ``If-Modified-Since`` (RFC 9110).
+"""
+
+import hashlib
+import os
+import re
+from email.utils import parsedate
+from mimetypes import guess_type
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = os.getenv("MEDIA_CACHE_CONTROL", "public, max-age=3600")
+
+# content hash or uuid4 hex, optionally with a "-<variant>" suffix
+CONTENT_NAME = re.compile(r"^(?:[0-9a-f]{64}|[0-9a-f]{32})(?:-[a-z]+)?\.[a-z0-9]+$")
+WEBP_NEGOTIABLE = {".jpg", ".jpeg", ".png"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+UNCOMPRESSIBLE = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+
+
+def _stat_file(path: str) -> os.stat_result | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st if os.path.isfile(path) else None
+
+
+def accepts(header: str, token: str) -> bool:
+    """Whether a comma-separated Accept(-Encoding) header lists ``token`` with q > 0."""
+    for part in header.split(","):
+        value, _, params = part.strip().partition(";")
+        if value.strip().lower() == token:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class MediaFiles(StaticFiles):
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        served = str(full_path)
+        media_type = guess_type(served)[0] or "application/octet-stream"
+        headers = {}
+        encoding = None
+
+        stem, ext = os.path.splitext(served)
+        if ext.lower() in WEBP_NEGOTIABLE:
+            headers["vary"] = "Accept"
+            if accepts(request_headers.get("accept", ""), "image/webp"):
+                webp = _stat_file(stem + ".webp")
+                if webp is not None:
+                    served, stat_result, media_type = stem + ".webp", webp, "image/webp"
+        elif media_type not in UNCOMPRESSIBLE:
+            headers["vary"] = "Accept-Encoding"
+            accept_encoding = request_headers.get("accept-encoding", "")
+            for candidate, suffix in PRECOMPRESSED:
+                if accepts(accept_encoding, candidate):
+                    compressed = _stat_file(served + suffix)
+                    if compressed is not None:
+                        served, stat_result, encoding = served + suffix, compressed, candidate
+                        headers["content-encoding"] = candidate
+                        break
+
+        name = os.path.basename(served)
+        if CONTENT_NAME.match(name):
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+            headers["etag"] = f'"{name}"'
+        else:
+            headers["cache-control"] = DEFAULT_CACHE_CONTROL
+            etag_base = f"{stat_result.st_mtime_ns}-{stat_result.st_size}-{encoding or ''}"
+            headers["etag"] = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+
+        response = FileResponse(
+            served,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            etag = response_headers.get("etag")
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return etag is not None and ("*" in tags or etag in tags)
+
+        if_modified_since = parsedate(request_headers.get("if-modified-since", ""))
+        last_modified = parsedate(response_headers.get("last-modified", ""))
+        return (
+            if_modified_since is not None
+            and last_modified is not None
+            and if_modified_since >= last_modified
+        )
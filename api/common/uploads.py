@@ -0,0 +1,131 @@
+"""
+Streaming image uploads.
+
+Starlette has already spooled a multipart file to a ``SpooledTemporaryFile``
+by the time an endpoint runs; ``file.file.read()`` pulls all of it back into
+memory. ``stage_image_upload`` instead copies it in fixed-size chunks into a
+temp file next to the destination, enforces the size limit and hashes the
+bytes as it goes, and checks the real type from the leading bytes. The
+caller then publishes the temp file under its content name with an atomic
+rename (``ContentStore.place``), so a half-written image is never visible.
+
+Because of that spooling, anything the endpoint checks comes after the
+whole body has been received. ``UploadSizeLimit`` caps the body of upload
+routes before the form is parsed: an oversized ``Content-Length`` gets a 413
+straight away, and a body that keeps coming past the cap (chunked, or lying
+about its length) is cut off as soon as it crosses it.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# room for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class StagedUpload(NamedTuple):
+    path: Path    # temp file on the destination's filesystem
+    ext: str      # from the content: .jpg / .png / .webp
+    digest: str   # hex SHA-256 of the bytes
+    size: int
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """File extension for JPEG/PNG/WebP content, ``None`` for anything else."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(413, detail=f"Image larger than {max_bytes // (1024 * 1024)} MB")
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware rejecting request bodies over ``max_body`` bytes on
+    paths matching ``paths``, before the endpoint parses the form.
+    """
+
+    def __init__(self, app: ASGIApp, paths: str, max_body: int):
+        self.app = app
+        self.paths = re.compile(paths)
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.paths.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        declared = Headers(scope=scope).get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_body:
+            too_large = _too_large(self.max_body - MULTIPART_OVERHEAD_BYTES)
+            response = JSONResponse({"detail": too_large.detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    # surfaces from the form parser as a 413 response
+                    raise _too_large(self.max_body - MULTIPART_OVERHEAD_BYTES)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def stage_image_upload(
+    upload: UploadFile, directory: Path, max_bytes: int = MAX_IMAGE_BYTES
+) -> StagedUpload:
+    """
+    Copy ``upload`` into a temp file in ``directory``; the caller owns (and
+    must place or delete) ``StagedUpload.path``.
+
+    Reads and writes hop to the threadpool one chunk at a time, so a slow
+    disk never pins a worker thread for a whole 20 MB photo.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            ext = sniff_image_type(chunk)
+            if ext is None:
+                raise HTTPException(400, detail="Only JPEG, PNG or WebP images are allowed")
+            written = 0
+            while chunk:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    return StagedUpload(Path(tmp), ext, digest.hexdigest(), written)
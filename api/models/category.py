@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from api.db.base import Base
 
@@ -11,3 +11,23 @@ class Category(Base):
     parent_id = Column(Integer, ForeignKey("catalog_category.id"), nullable=True)
     slug = Column(String(140), unique=True, nullable=False)
     products = relationship("Product", back_populates="category")
+
+
+class CategoryClosure(Base):
+    """Ancestor/descendant pairs maintained by Django's Category.save."""
+
+    __tablename__ = "catalog_category_closure"
+
+    id = Column(Integer, primary_key=True)
+    ancestor_id = Column(Integer, ForeignKey("catalog_category.id"), nullable=False)
+    descendant_id = Column(Integer, ForeignKey("catalog_category.id"), nullable=False)
+    depth = Column(Integer, nullable=False)
+
+
+class CategoryTreeVersion(Base):
+    """Single row (id=1) bumped by Django signals on every Category write."""
+
+    __tablename__ = "catalog_category_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,8 +1,6 @@
 from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import declarative_base
-
-Base = declarative_base()
+from api.db.base import Base
 
 
 class Favorite(Base):
@@ -11,7 +9,8 @@ class Favorite(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("auth_user.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("catalog_product.id"), nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    # Django's auto_now_add leaves no DB default, so send now() ourselves
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
 
     __table_args__ = (
         UniqueConstraint("user_id", "product_id", name="uniq_favorite_user_product"),
@@ -1,8 +1,7 @@
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import Boolean, Column, Integer, String, Numeric, ForeignKey, DateTime, JSON
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-
-Base = declarative_base()
+from api.db.base import Base
 
 
 class Order(Base):
@@ -16,12 +15,14 @@ class Order(Base):
     shipping = Column(Numeric(12, 2), nullable=False, default=0)
     total = Column(Numeric(12, 2), nullable=False, default=0)
 
-    shipping_address_id = Column(
-        Integer, ForeignKey("shipping_address.id"), nullable=True
-    )
+    # FK to shipping_address lives in the DB; the table is not mapped here
+    shipping_address_id = Column(Integer, nullable=True)
     shipping_snapshot = Column(JSON, nullable=False, default=dict)
 
-    created_at = Column(DateTime, server_default=func.now())
+    # Django's auto_now_add leaves no DB default, so send now() ourselves
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    # True when creating the order decremented stock; see _release_stock
+    stock_reserved = Column(Boolean, nullable=False, default=False)
 
     items = relationship(
         "OrderItem", back_populates="order", cascade="all, delete-orphan"
@@ -1,9 +1,11 @@
 from sqlalchemy import Column, Integer, String, Numeric, Boolean, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, joinedload, relationship, selectinload
 from typing import Optional
 from pydantic import BaseModel, Field
 from sqlalchemy.sql import func
 from api.db.base import Base
+from api.models.user import User
 
 
 class Product(Base):
@@ -26,7 +28,10 @@ class Product(Base):
     status = Column(String(10), nullable=False, default="draft")
     is_handmade = Column(Boolean, nullable=False, default=True)
 
-    created_at = Column(DateTime, server_default=func.now())
+    # Django's auto_now_add leaves no DB default, so send now() ourselves
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    # trigger-maintained (title + description); only used in WHERE/ORDER BY
+    search_vector = deferred(Column(TSVECTOR))
 
     images = relationship("ProductImage", back_populates="product", lazy="selectin")
 
@@ -60,6 +65,23 @@ class Product(Base):
         return None
 
 
+def product_card_options():
+    """
+    Loader options for anything serialized as ``ProductOut``.
+
+    ``category_name``, ``shop_name``, ``location`` and ``phone_number`` walk
+    category and seller -> seller_profile; without these options every row
+    lazy-loads them one by one. Many-to-one sides are joined into the main
+    SELECT and images come in one extra IN query, so a page of any size costs
+    two queries.
+    """
+    return (
+        joinedload(Product.category),
+        joinedload(Product.seller).joinedload(User.seller_profile),
+        selectinload(Product.images),
+    )
+
+
 # class ProductImage(Base):
 #     __tablename__ = "catalog_productimage"
 
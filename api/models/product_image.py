@@ -1,5 +1,6 @@
 # api/models/product_image.py
 from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from api.db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -14,4 +15,6 @@ class ProductImage(Base):
     )  # e.g. "products/abc.jpg" (relative to MEDIA_ROOT)
     alt = Column(String(120), nullable=True)
     position = Column(Integer, nullable=False, default=0)
+    # {"thumb"|"card"|"full": {"webp": path, "jpeg": path}}, see catalog.images
+    variants = Column(JSONB, nullable=False, default=dict)
     product = relationship("Product", back_populates="images")
@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+from api.db.base import Base
+
+
+class RevokedToken(Base):
+    """Mirror of Django's ``users.RevokedToken`` (``users_revoked_token``)."""
+
+    __tablename__ = "users_revoked_token"
+
+    id = Column(BigInteger, primary_key=True)
+    # refresh-token jti, session id, or SHA-256 of an access token
+    token_id = Column(String(64), nullable=False, unique=True)
+    kind = Column(String(16), nullable=False)  # "refresh" | "session" | "access"
+    user_id = Column(Integer, ForeignKey("auth_user.id"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class RevokedTokenVersion(Base):
+    """Single row (id=1), bumped by ``revoke_tokens`` with every revocation."""
+
+    __tablename__ = "users_revoked_token_version"
+
+    id = Column(BigInteger, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,11 +1,32 @@
 # api/routers/auth.py — login with Django users → JWT
 from fastapi import APIRouter, Depends, HTTPException, status
-from datetime import datetime, timezone
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials
+import time
+from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel, EmailStr, field_validator, ValidationInfo
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import exists
 from ..deps import get_db
-from ..security import authenticate_user, create_access_token, hash_password
+from ..security import (
+    JWT_REFRESH_EXPIRE_DAYS,
+    REVOKED_ACCESS,
+    REVOKED_REFRESH,
+    REVOKED_SESSION,
+    authenticate_user,
+    bearer_scheme,
+    create_access_token,
+    create_refresh_token,
+    credential_filter,
+    decode_access_token,
+    decode_refresh_token,
+    hash_password,
+    is_revoked,
+    revoke_tokens,
+    revoked_tokens,
+    run_password_hasher,
+    token_digest,
+)
 from ..models.user import User, SellerProfile
 from api.common.enums import LocationEnum
 
@@ -19,9 +40,21 @@ class LoginInput(BaseModel):
 
 class TokenOut(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
 
 
+class RefreshInput(BaseModel):
+    refresh_token: str
+
+
+def _issue_tokens(user: User, family: str | None = None) -> TokenOut:
+    return TokenOut(
+        access_token=create_access_token(user_id=user.id, username=user.username),
+        refresh_token=create_refresh_token(user_id=user.id, family=family),
+    )
+
+
 # 🆕 Signup input
 class SignupInput(BaseModel):
     username: str
@@ -33,6 +66,12 @@ class SignupInput(BaseModel):
     phone_number: str
     bio: str | None = None
 
+    @field_validator("email")
+    def normalize_email(cls, v: str) -> str:
+        # as Django's BaseUserManager.normalize_email: lowercase the domain
+        local, _, domain = v.strip().rpartition("@")
+        return f"{local}@{domain.lower()}"
+
     @field_validator("confirm_password")
     def passwords_match(cls, v: str, info: ValidationInfo) -> str:
         pwd = info.data.get("password")
@@ -41,57 +80,45 @@ class SignupInput(BaseModel):
         return v
 
 
+# Async so password hashing waits on its own bounded pool (see security.py)
+# instead of pinning a shared threadpool thread; DB calls hop to the threadpool.
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginInput, db: Session = Depends(get_db)):
-    user = authenticate_user(db, payload.username_or_email, payload.password)
+async def login(payload: LoginInput, db: Session = Depends(get_db)):
+    user = await authenticate_user(db, payload.username_or_email, payload.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
 
-    token = create_access_token(user_id=user.id, username=user.username)
-    return TokenOut(access_token=token)
+    return _issue_tokens(user)
 
 
-# 🆕 /auth/signup — seller olarak kayıt
-@router.post("/signup", response_model=TokenOut, status_code=status.HTTP_201_CREATED)
-def signup(payload: SignupInput, db: Session = Depends(get_db)):
-    # 1) username / email var mı?
-    existing_user = (
-        db.query(User)
-        .filter(
-            or_(
-                User.username == payload.username,
-                User.email == payload.email,
-            )
-        )
-        .first()
-    )
-    if existing_user:
+def _check_signup_available(db: Session, payload: SignupInput) -> None:
+    # username / email / shop_name: one round trip, each probe index-backed
+    user_taken, shop_taken = db.query(
+        exists().where(credential_filter(payload.username, payload.email)),
+        exists().where(SellerProfile.shop_name == payload.shop_name),
+    ).one()
+    if user_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already exists",
         )
-
-    # 2) shop_name var mı?
-    existing_shop = (
-        db.query(SellerProfile)
-        .filter(SellerProfile.shop_name == payload.shop_name)
-        .first()
-    )
-    if existing_shop:
+    if shop_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Shop name already exists",
         )
 
+
+def _create_seller(db: Session, payload: SignupInput, password_hash: str) -> User:
     now = datetime.now(timezone.utc)
 
     # 3) Django ile uyumlu user oluştur
     user = User(
         username=payload.username,
         email=payload.email,
-        password=hash_password(payload.password),  # ⬅️ Django hash
+        password=password_hash,  # ⬅️ Django hash
         is_active=True,
         is_staff=False,
         is_superuser=False,
@@ -114,9 +141,100 @@ def signup(payload: SignupInput, db: Session = Depends(get_db)):
     )
     db.add(seller_profile)
 
-    # 5) commit + token döndür
+    # 5) commit
     db.commit()
     db.refresh(user)
+    return user
+
+
+# 🆕 /auth/signup — seller olarak kayıt
+@router.post("/signup", response_model=TokenOut, status_code=status.HTTP_201_CREATED)
+async def signup(payload: SignupInput, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_signup_available, db, payload)
+    password_hash = await run_password_hasher(hash_password, payload.password)
+    user = await run_in_threadpool(_create_seller, db, payload, password_hash)
+
+    return _issue_tokens(user)
+
+
+def _session_expiry() -> datetime:
+    # no token of a session outlives the newest refresh token issued in it
+    return datetime.now(timezone.utc) + timedelta(days=JWT_REFRESH_EXPIRE_DAYS)
+
+
+def _rotate_refresh_token(db: Session, claims: dict) -> User:
+    user_id = int(claims["sub"])
+    expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+    # the insert is the authority: exactly one caller gets to spend a token
+    if not revoke_tokens(db, REVOKED_REFRESH, user_id, expires_at, claims["jti"]):
+        # already spent, so one of two holders is not the user: end the session
+        revoke_tokens(db, REVOKED_SESSION, user_id, _session_expiry(), claims["fam"])
+        db.commit()
+        revoked_tokens.refresh()
+        raise HTTPException(status_code=401, detail="Refresh token already used")
+    # this worker's snapshot may predate a revocation made on another one
+    if is_revoked(db, claims["fam"]):
+        db.rollback()
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+    db.commit()
 
-    token = create_access_token(user_id=user.id, username=user.username)
-    return TokenOut(access_token=token)
+    user = db.get(User, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return user
+
+
+# /auth/refresh — new access token without a password check
+@router.post("/refresh", response_model=TokenOut)
+async def refresh(payload: RefreshInput, db: Session = Depends(get_db)):
+    """
+    Trade a refresh token for a new access/refresh pair. Each refresh token
+    works once; replaying a spent one revokes every token of its session.
+    """
+    claims = decode_refresh_token(payload.refresh_token)
+    # known-revoked sessions are turned away from memory
+    if claims["fam"] in revoked_tokens.peek(frozenset()):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+    user = await run_in_threadpool(_rotate_refresh_token, db, claims)
+    return _issue_tokens(user, family=claims["fam"])
+
+
+def _revoke_session(db: Session, claims: dict, access: tuple[str, int | None] | None) -> None:
+    user_id = int(claims["sub"])
+    # as with rotation, the insert decides: a session is ended once
+    if not revoke_tokens(db, REVOKED_SESSION, user_id, _session_expiry(), claims["fam"]):
+        db.rollback()
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+    if access is not None:
+        digest, exp = access
+        expires_at = (
+            _session_expiry() if exp is None else datetime.fromtimestamp(exp, timezone.utc)
+        )
+        revoke_tokens(db, REVOKED_ACCESS, user_id, expires_at, digest)
+    db.commit()
+    revoked_tokens.refresh()
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    payload: RefreshInput,
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+):
+    """
+    Revoke the refresh token's session and, if sent, the Bearer access token.
+    The access token must be a valid one of the same user; an expired one is
+    accepted but needs no revocation.
+    """
+    claims = decode_refresh_token(payload.refresh_token)
+    if claims["fam"] in revoked_tokens.peek(frozenset()):
+        raise HTTPException(status_code=401, detail="Refresh token revoked")
+
+    access = None
+    if creds is not None and creds.credentials:
+        user_id, exp = decode_access_token(creds.credentials, allow_expired=True)
+        if user_id != int(claims["sub"]):
+            raise HTTPException(status_code=401, detail="Access token does not match refresh token")
+        if exp is None or exp > time.time():
+            access = (token_digest(creds.credentials), exp)
+    await run_in_threadpool(_revoke_session, db, claims, access)
@@ -1,10 +1,14 @@
 # api/routers/categories.py
+import hashlib
+import os
 from typing import Dict, List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from ..deps import get_db
-from ..models.category import Category
+from ..common.cache import VersionedSnapshot
+from ..deps import SessionLocal, get_db
+from ..models.category import Category, CategoryClosure, CategoryTreeVersion
 from ..schemas.category import CategoryOut, CategoryNode
 
 router = APIRouter(prefix="/categories", tags=["categories"])
@@ -16,10 +20,7 @@ def list_categories(db: Session = Depends(get_db)):
     return rows
 
 
-@router.get("/tree", response_model=List[CategoryNode])
-def tree(db: Session = Depends(get_db)):
-    rows: List[Category] = db.query(Category).all()
-
+def build_tree(rows: List[Category]) -> List[CategoryNode]:
     # Build map id -> node (dict with children list)
     node_map: Dict[int, CategoryNode] = {}
     for r in rows:
@@ -46,3 +47,69 @@ def tree(db: Session = Depends(get_db)):
 
     roots.sort(key=lambda c: c.name.lower())
     return roots
+
+
+_tree_adapter = TypeAdapter(List[CategoryNode])
+
+
+def _load_tree_version() -> int:
+    with SessionLocal() as db:
+        return (
+            db.query(CategoryTreeVersion.version)
+            .filter(CategoryTreeVersion.id == 1)
+            .scalar()
+            or 0
+        )
+
+
+def _build_tree_payload() -> tuple[bytes, str]:
+    """Serialized tree bytes plus a strong ETag over them."""
+    with SessionLocal() as db:
+        body = _tree_adapter.dump_json(build_tree(db.query(Category).all()))
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return body, etag
+
+
+# Every frontend page asks for the tree, which only changes on admin edits
+_tree_snapshot = VersionedSnapshot(
+    _load_tree_version,
+    _build_tree_payload,
+    check_interval=float(os.getenv("CATEGORY_TREE_CHECK_INTERVAL", "5")),
+)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.get("/tree", response_model=List[CategoryNode])
+def tree(request: Request):
+    """
+    Whole category tree, served from a pre-serialized in-process snapshot.
+
+    The snapshot is rebuilt in the background when the category version row
+    changes. Clients sending ``If-None-Match`` with the current ETag get 304.
+    """
+    body, etag = _tree_snapshot.get()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{category_id}/ancestors", response_model=List[CategoryOut])
+def ancestors(category_id: int, db: Session = Depends(get_db)):
+    """Breadcrumb for a category: root first, the category itself last."""
+    rows = (
+        db.query(Category)
+        .join(CategoryClosure, CategoryClosure.ancestor_id == Category.id)
+        .filter(CategoryClosure.descendant_id == category_id)
+        .order_by(CategoryClosure.depth.desc())
+        .all()
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return rows
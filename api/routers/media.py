@@ -0,0 +1,105 @@
+# api/routers/media.py — On-demand resized product images for responsive srcset
+import asyncio
+import os
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from ..common.cache import DiskLRUCache
+from ..common.static import CONTENT_NAME, DEFAULT_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, accepts
+from ..deps import get_db
+from ..models.product_image import ProductImage
+from backend.apps.catalog.images import render_width, variant_pool
+
+router = APIRouter(prefix="/media", tags=["media"])
+
+# same root the seller endpoints upload into
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", "media")).resolve()
+RESIZE_WIDTHS = frozenset(
+    int(w) for w in os.getenv("RESIZE_WIDTHS", "160,320,480,640,800,1024,1280,1600").split(",")
+)
+_resize_cache = DiskLRUCache(
+    os.getenv("RESIZE_CACHE_DIR", str(MEDIA_ROOT / "cache" / "resize")),
+    max_bytes=int(os.getenv("RESIZE_CACHE_BYTES", str(512 * 1024 * 1024))),
+)
+
+
+def _is_product_image(db: Session, path: str) -> bool:
+    return (
+        db.query(ProductImage.id).filter(ProductImage.image == path).first()
+        is not None
+    )
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None  # evicted (possibly by another worker) since the lookup
+
+
+@router.get("/resize/{width}/{path:path}")
+async def resize_image(
+    width: int,
+    path: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    ``path`` (a ``catalog_productimage.image`` value) scaled to ``width``
+    pixels wide, as WebP when the client accepts it and JPEG otherwise.
+
+    Results live in a byte-bounded disk LRU, shared by the workers. Every
+    request checks that ``path`` is still a product image, so copies of a
+    deleted one stop being served at once; the ETag is known from the
+    request alone, so revalidations end there. Misses are rendered in the
+    image process pool, one render per width/format/path however many
+    requests arrive for it at once.
+    """
+    if width not in RESIZE_WIDTHS:
+        raise HTTPException(400, detail=f"width must be one of {sorted(RESIZE_WIDTHS)}")
+    # never serve or render arbitrary files, just current product images
+    if not await run_in_threadpool(_is_product_image, db, path):
+        raise HTTPException(404, detail="Image not found")
+    fmt = "webp" if accepts(request.headers.get("accept", ""), "image/webp") else "jpeg"
+    suffix = ".webp" if fmt == "webp" else ".jpg"
+    key = f"{width}/{fmt}/{path}"
+
+    name = os.path.basename(path)
+    headers = {
+        "vary": "Accept",
+        "etag": f'"{width}-{os.path.splitext(name)[0]}{suffix}"',
+        "cache-control": (
+            IMMUTABLE_CACHE_CONTROL if CONTENT_NAME.match(name) else DEFAULT_CACHE_CONTROL
+        ),
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["etag"] in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    # resized copies are small: read them whole, so an eviction between the
+    # lookup and the response is a miss rather than a missing file
+    cached = await _resize_cache.get(key, suffix)
+    body = None if cached is None else await run_in_threadpool(_read, cached)
+    if body is None:
+        source = (MEDIA_ROOT / path).resolve()
+        if not source.is_relative_to(MEDIA_ROOT) or not source.is_file():
+            raise HTTPException(404, detail="Image not found")
+
+        async def produce(target: Path) -> None:
+            await asyncio.get_running_loop().run_in_executor(
+                variant_pool(), render_width, str(source), str(target), width, fmt
+            )
+
+        try:
+            cached = await _resize_cache.get_or_create(key, produce, suffix)
+        except (OSError, Image.DecompressionBombError):
+            raise HTTPException(422, detail="Image cannot be decoded")
+        body = await run_in_threadpool(_read, cached)
+        if body is None:
+            raise HTTPException(503, detail="Resize cache is under pressure, retry")
+    return Response(body, media_type=f"image/{fmt}", headers=headers)
@@ -0,0 +1,12 @@
+# api/routers/metrics.py — Runtime counters of the in-process worker pools
+from fastapi import APIRouter
+
+from ..security import password_hasher
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/hashing")
+def hashing_metrics():
+    """Admissions, 503 sheds, queue wait and hash time of the password pool (this worker)."""
+    return password_hasher.stats()
@@ -1,17 +1,82 @@
 # api/routers/orders.py (JWT version with list + cancel)
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session, lazyload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from ..common.pagination import (
+    decode_id_cursor,
+    encode_cursor,
+    set_next_cursor,
+    split_page,
+)
 from ..deps import get_db
 from ..security import get_current_user_id  # JWT Bearer dependency
 from ..models.order import Order, OrderItem
 from ..models.product import Product
-from ..schemas.order import OrderOut, OrderCreateQuick
+from .products import invalidate_product_detail
+from ..schemas.order import (
+    CartCheckout,
+    OrderCreateQuick,
+    OrderOut,
+    OrderSummaryOut,
+)
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def _reserve_stock(db: Session, product_id: int, quantity: int) -> Decimal:
+    """
+    Take ``quantity`` units of an active product and return its unit price.
+
+    A single conditional ``UPDATE ... WHERE stock_quantity >= :q RETURNING``
+    does check and decrement atomically under the row lock, so parallel
+    buyers can never drive stock below zero. Nothing is committed here.
+    """
+    price = db.execute(
+        update(Product)
+        .where(
+            Product.id == product_id,
+            Product.status == "active",
+            Product.stock_quantity >= quantity,
+        )
+        .values(stock_quantity=Product.stock_quantity - quantity)
+        .returning(Product.price)
+    ).scalar()
+    if price is not None:
+        return Decimal(price)
+
+    # Failure path only: tell "gone" apart from "not enough left"
+    exists = (
+        db.query(Product.id)
+        .filter(Product.id == product_id, Product.status == "active")
+        .first()
+    )
+    if not exists:
+        raise HTTPException(status_code=404, detail="Product not found or inactive")
+    raise HTTPException(status_code=409, detail="Insufficient stock")
+
+
+def _release_stock(db: Session, order_id: int) -> list[int]:
+    """
+    Put an order's quantities back on the shelf in one UPDATE ... FROM and
+    return the restocked product ids. Only for ``stock_reserved`` orders.
+    """
+    per_product = (
+        select(OrderItem.product_id, func.sum(OrderItem.quantity).label("qty"))
+        .where(OrderItem.order_id == order_id)
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    return db.execute(
+        update(Product)
+        .where(Product.id == per_product.c.product_id)
+        .values(stock_quantity=Product.stock_quantity + per_product.c.qty)
+        .returning(Product.id)
+    ).scalars().all()
+
+
 @router.post("", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
 def create_order_quick(
     payload: OrderCreateQuick,
@@ -19,18 +84,10 @@ def create_order_quick(
     user_id: int = Depends(get_current_user_id),
 ):
     """Create a basic single-product order using JWT user context."""
-    product = (
-        db.query(Product)
-        .filter(Product.id == payload.product_id, Product.status == "active")
-        .first()
-    )
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found or inactive")
-
     if payload.quantity < 1:
         raise HTTPException(status_code=400, detail="Quantity must be >= 1")
 
-    unit_price = Decimal(product.price)
+    unit_price = _reserve_stock(db, payload.product_id, payload.quantity)
     subtotal = unit_price * payload.quantity
     shipping = Decimal(payload.shipping or 0)
     total = subtotal + shipping
@@ -43,41 +100,177 @@ def create_order_quick(
         total=total,
         shipping_address_id=payload.address_id,
         shipping_snapshot={},
+        stock_reserved=True,
     )
     db.add(order)
     db.flush()
 
     item = OrderItem(
         order_id=order.id,
-        product_id=product.id,
+        product_id=payload.product_id,
         quantity=payload.quantity,
         unit_price=unit_price,
     )
     db.add(item)
 
     db.commit()
+    # cached detail/batch payloads carry stock_quantity
+    invalidate_product_detail(payload.product_id)
     db.refresh(order)
     order.items
     return order
 
 
+@router.post(
+    "/checkout", response_model=OrderOut, status_code=status.HTTP_201_CREATED
+)
+def checkout_cart(
+    payload: CartCheckout,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Turn a whole cart into one order in a single transaction.
+
+    All products are locked with one ``SELECT ... FOR UPDATE`` in id order, so
+    concurrent checkouts over overlapping carts queue instead of deadlocking,
+    and stock is checked and decremented under those locks.
+    The order row and then all items are inserted (the items as one bulk
+    INSERT ... RETURNING) and the transaction commits once.
+    """
+    quantities: dict[int, int] = {}
+    for line in payload.items:
+        quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+
+    products = (
+        db.query(Product)
+        .options(lazyload(Product.images))
+        .filter(Product.id.in_(list(quantities)), Product.status == "active")
+        .order_by(Product.id)
+        .with_for_update()
+        .all()
+    )
+    missing = set(quantities) - {p.id for p in products}
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Products not found or inactive: {sorted(missing)}",
+        )
+
+    short = [p.id for p in products if p.stock_quantity < quantities[p.id]]
+    if short:
+        raise HTTPException(status_code=409, detail=f"Insufficient stock: {short}")
+
+    subtotal = Decimal("0")
+    lines = []
+    for product in products:
+        unit_price = Decimal(product.price)
+        quantity = quantities[product.id]
+        subtotal += unit_price * quantity
+        lines.append(
+            {"product_id": product.id, "quantity": quantity, "unit_price": unit_price}
+        )
+    shipping = Decimal(payload.shipping or 0)
+
+    # Rows are locked above, so a plain executemany decrement is race-free
+    db.execute(
+        update(Product),
+        [
+            {"id": p.id, "stock_quantity": p.stock_quantity - quantities[p.id]}
+            for p in products
+        ],
+    )
+
+    order = Order(
+        buyer_id=user_id,
+        status="pending",
+        subtotal=subtotal,
+        shipping=shipping,
+        total=subtotal + shipping,
+        shipping_address_id=payload.address_id,
+        shipping_snapshot={},
+        stock_reserved=True,
+    )
+    db.add(order)
+    db.flush()
+    for line in lines:
+        line["order_id"] = order.id
+    items = db.scalars(insert(OrderItem).returning(OrderItem), lines).all()
+    set_committed_value(order, "items", items)
+    # serialize before commit so the response needs no reload round trips
+    out = OrderOut.model_validate(order)
+    db.commit()
+    invalidate_product_detail(*quantities)
+    return out
+
+
 @router.get("", response_model=list[OrderOut])
 def list_orders(
+    response: Response,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Opaque X-Next-Cursor value from the previous page"
+    ),
 ):
-    """Return all orders of the current user, newest first."""
-    orders = (
+    """
+    Orders of the current user, newest first, one page at a time.
+
+    Items of the whole page are loaded with one extra IN query. Follow the
+    ``X-Next-Cursor`` response header for older orders.
+    """
+    query = (
         db.query(Order)
+        .options(selectinload(Order.items))
         .filter(Order.buyer_id == user_id)
-        .order_by(Order.id.desc())
-        .all()
     )
-    for o in orders:
-        o.items
+    if cursor:
+        query = query.filter(Order.id < decode_id_cursor(cursor))
+    orders, has_more = split_page(
+        query.order_by(Order.id.desc()).limit(limit + 1).all(), limit
+    )
+    if has_more:
+        set_next_cursor(response, encode_cursor(id=orders[-1].id))
     return orders
 
 
+@router.get("/summary", response_model=list[OrderSummaryOut])
+def list_order_summaries(
+    response: Response,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = Query(
+        None, description="Opaque X-Next-Cursor value from the previous page"
+    ),
+):
+    """
+    Compact order history (no item rows): one aggregate query per page.
+    Paginated like ``GET /orders``.
+    """
+    query = (
+        db.query(
+            Order.id,
+            Order.status,
+            Order.total,
+            Order.created_at,
+            func.count(OrderItem.id).label("item_count"),
+        )
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .filter(Order.buyer_id == user_id)
+        .group_by(Order.id)
+    )
+    if cursor:
+        query = query.filter(Order.id < decode_id_cursor(cursor))
+    rows, has_more = split_page(
+        query.order_by(Order.id.desc()).limit(limit + 1).all(), limit
+    )
+    if has_more:
+        set_next_cursor(response, encode_cursor(id=rows[-1].id))
+    return [OrderSummaryOut.model_validate(row) for row in rows]
+
+
 @router.get("/{order_id}", response_model=OrderOut)
 def get_order(
     order_id: int,
@@ -99,17 +292,33 @@ def cancel_order(
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id),
 ):
-    """Cancel an order if it is still pending."""
-    order = (
-        db.query(Order).filter(Order.id == order_id, Order.buyer_id == user_id).first()
-    )
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    """
+    Cancel an order if it is still pending (or paid) and restock its items.
 
-    if order.status not in ("pending", "paid"):
+    The status change is a conditional UPDATE, so two racing cancels cannot
+    both release the same stock.
+    """
+    canceled = db.execute(
+        update(Order)
+        .where(
+            Order.id == order_id,
+            Order.buyer_id == user_id,
+            Order.status.in_(("pending", "paid")),
+        )
+        .values(status="canceled")
+        .returning(Order.stock_reserved)
+    ).scalar()
+    if canceled is None:
+        exists = (
+            db.query(Order.id)
+            .filter(Order.id == order_id, Order.buyer_id == user_id)
+            .first()
+        )
+        if not exists:
+            raise HTTPException(status_code=404, detail="Order not found")
         raise HTTPException(status_code=400, detail="Cannot cancel this order")
 
-    order.status = "canceled"
+    restocked = _release_stock(db, order_id) if canceled else []
     db.commit()
-    db.refresh(order)
-    return {"status": "canceled", "order_id": order.id}
+    invalidate_product_detail(*restocked)
+    return {"status": "canceled", "order_id": order_id}
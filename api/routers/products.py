@@ -1,43 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, selectinload
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import REAL, and_, cast, or_, select
+from sqlalchemy.orm import Session, joinedload
+from ..common.cache import TTLCache
+from ..common.pagination import (
+    decode_cursor,
+    decode_id_cursor,
+    encode_cursor,
+    set_next_cursor,
+    split_page,
+)
+from ..common.search import apply_search
 from ..schemas.product import ProductDetailOut
 from ..deps import get_db
 from ..security import get_optional_user_id
 from ..models.user import User
 from ..schemas.user import SellerShortOut
-from ..models.product_image import ProductImage
 from ..schemas.product_image import ProductImageOut
 from ..models.favorite import Favorite
-from ..models.product import Product
+from ..models.category import CategoryClosure
+from ..models.product import Product, product_card_options
 from ..schemas.product import ProductOut
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+# Public product detail payloads, keyed by product id. Seller writes
+# invalidate entries; the TTL covers edits made through the Django admin.
+_detail_cache = TTLCache(
+    maxsize=int(os.getenv("PRODUCT_DETAIL_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("PRODUCT_DETAIL_CACHE_TTL", "60")),
+)
+
+BATCH_MAX_IDS = 100
+
 
 @router.get("", response_model=list[ProductOut])
 def list_products(
+    response: Response,
     db: Session = Depends(get_db),
-    q: str | None = Query(None, description="Text search in title"),
+    q: str | None = Query(None, description="Full-text search in title and description"),
     category_id: int | None = Query(None),
+    include_descendants: bool = Query(
+        False, description="Also match products filed under subcategories"
+    ),
     price_min: float | None = Query(None, ge=0),
     price_max: float | None = Query(None, ge=0),
     limit: int = Query(24, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        None, description="Opaque X-Next-Cursor value from the previous page"
+    ),
 ):
+    """
+    Active products, newest first (best match first when ``q`` is given).
+
+    Every full page sets an ``X-Next-Cursor`` header; passing it back as
+    ``cursor`` continues with an indexed ``id < last_id`` seek, so deep pages
+    cost the same as the first one. ``offset`` is still honoured for older
+    clients but is ignored when a cursor is given.
+    """
     query = (
         db.query(Product)
-        .options(
-            selectinload(Product.images),  # Product.images ilişkisinin dolması için
-            selectinload(Product.category),  # category_name property’si için
-        )
+        .options(*product_card_options())
         .filter(Product.status == "active")
     )
 
+    rank = None
     if q:
-        ilike = f"%{q}%"
-        query = query.filter(Product.title.ilike(ilike))
+        query, rank = apply_search(query, q)
 
-    if category_id:
+    if category_id and include_descendants:
+        subtree = select(CategoryClosure.descendant_id).where(
+            CategoryClosure.ancestor_id == category_id
+        )
+        query = query.filter(Product.category_id.in_(subtree))
+    elif category_id:
         query = query.filter(Product.category_id == category_id)
 
     if price_min is not None:
@@ -46,9 +84,36 @@ def list_products(
     if price_max is not None:
         query = query.filter(Product.price <= price_max)
 
-    rows = query.order_by(Product.id.desc()).offset(offset).limit(limit).all()
+    if rank is None:
+        query = query.order_by(Product.id.desc())
+        if cursor:
+            query = query.filter(Product.id < decode_id_cursor(cursor))
+        elif offset:
+            query = query.offset(offset)
 
-    return rows
+        rows, has_more = split_page(query.limit(limit + 1).all(), limit)
+        if has_more:
+            set_next_cursor(response, encode_cursor(id=rows[-1].id))
+        return rows
+
+    # Relevance order: the cursor carries (rank, id) of the last row
+    query = query.add_columns(rank).order_by(rank.desc(), Product.id.desc())
+    if cursor:
+        key = decode_cursor(cursor, rank=float, id=int)
+        # ts_rank is float4: compare in float4 too, or the round-tripped
+        # value never equals the stored one
+        last_rank = cast(key["rank"], REAL)
+        query = query.filter(
+            or_(rank < last_rank, and_(rank == last_rank, Product.id < key["id"]))
+        )
+    elif offset:
+        query = query.offset(offset)
+
+    ranked, has_more = split_page(query.limit(limit + 1).all(), limit)
+    if has_more:
+        last, last_rank = ranked[-1]
+        set_next_cursor(response, encode_cursor(rank=last_rank, id=last.id))
+    return [prod for prod, _ in ranked]
 
 
 # @router.get("/{slug}", response_model=ProductOut)
@@ -63,69 +128,158 @@ def list_products(
 #     return row
 
 
-@router.get("/{product_id}", response_model=ProductDetailOut)
-def product_detail_2(
-    product_id: int,
-    db: Session = Depends(get_db),
-    user_id: int | None = Depends(get_optional_user_id),
-):
-    """
-    Buyer tarafı için product detay:
-    - seller bilgisi
-    - resimler
-    - is_favorited (login olduysa)
-    """
-    # Sadece aktif ürünleri göster
+def _public_detail(db: Session, product_id: int) -> ProductDetailOut | None:
+    """Everything except ``is_favorited``, loaded in a single joined SELECT."""
     prod = (
         db.query(Product)
+        .options(
+            joinedload(Product.category),
+            joinedload(Product.seller).joinedload(User.seller_profile),
+            joinedload(Product.images),
+        )
         .filter(Product.id == product_id, Product.status == "active")
-        .first()
+        .one_or_none()
     )
     if not prod:
-        raise HTTPException(status_code=404, detail="Product not found")
-
-    # Seller bilgisi
-    seller = db.query(User).filter(User.id == prod.seller_id).first()
-    if not seller:
+        return None
+    if not prod.seller:
         raise HTTPException(status_code=500, detail="Seller not found")
+    return _to_detail(prod)
 
-    seller_out = SellerShortOut.from_orm(seller)
-
-    # Görseller
-    images = (
-        db.query(ProductImage)
-        .filter(ProductImage.product_id == prod.id)
-        .order_by(ProductImage.position.asc(), ProductImage.id.asc())
-        .all()
-    )
-    images_out = [ProductImageOut.from_orm(img) for img in images]
-
-    # Favori mi?
-    is_fav = False
-    if user_id is not None:
-        fav = (
-            db.query(Favorite)
-            .filter(Favorite.user_id == user_id, Favorite.product_id == prod.id)
-            .first()
-        )
-        is_fav = fav is not None
 
+def _to_detail(prod: Product) -> ProductDetailOut:
+    images = sorted(prod.images, key=lambda img: (img.position, img.id))
     return ProductDetailOut(
         id=prod.id,
         title=prod.title,
         slug=prod.slug,
-        description=prod.description,
+        description=prod.description or "",
         price=prod.price,
         currency=prod.currency,
+        stock_quantity=prod.stock_quantity,
         status=prod.status,
         is_handmade=prod.is_handmade,
         category_id=prod.category_id,
-        category_name=getattr(prod, "category_name", None),
-        shop_name=getattr(prod, "shop_name", None),
-        location=getattr(prod, "location", None),
-        phone_number=getattr(prod, "phone_number", None),
+        category_name=prod.category_name,
+        shop_name=prod.shop_name,
+        location=prod.location,
+        phone_number=prod.phone_number,
         created_at=prod.created_at,
-        seller=seller_out,
-        images=images_out,
-        is_favorited=is_fav,
+        seller=SellerShortOut.model_validate(prod.seller),
+        images=[ProductImageOut.model_validate(img) for img in images],
+        is_favorited=False,
+    )
+
+
+def invalidate_product_detail(*product_ids: int) -> None:
+    """Drop cached detail payloads; call after any write that changes them."""
+    for product_id in product_ids:
+        _detail_cache.delete(product_id)
+
+
+def _parse_ids(raw: str) -> list[int]:
+    ids: list[int] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            ids.append(int(part))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid product id: {part}")
+    # de-duplicate, keeping the first position of each id
+    return list(dict.fromkeys(ids))
+
+
+@router.get("/batch", response_model=list[ProductDetailOut])
+def product_batch(
+    ids: str = Query(..., description="Comma-separated product ids, e.g. 3,1,7"),
+    db: Session = Depends(get_db),
+    user_id: int | None = Depends(get_optional_user_id),
+):
+    """
+    Hydrate many products in one call (favorites, order lines, recently viewed).
+
+    Results follow the order of ``ids``; unknown or inactive ids are skipped.
+    Cached detail payloads are reused, the misses are loaded with one
+    ``IN (...)`` query, and favorite flags come from one more query.
+    """
+    product_ids = _parse_ids(ids)
+    if len(product_ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request"
+        )
+
+    found: dict[int, ProductDetailOut] = {}
+    missing = []
+    for pid in product_ids:
+        cached = _detail_cache.get(pid)
+        if cached is None:
+            missing.append(pid)
+        else:
+            found[pid] = cached
+
+    if missing:
+        rows = (
+            db.query(Product)
+            .options(*product_card_options())
+            .filter(Product.id.in_(missing), Product.status == "active")
+            .all()
+        )
+        for prod in rows:
+            if prod.seller is None:
+                continue
+            detail = _to_detail(prod)
+            _detail_cache.set(prod.id, detail)
+            found[prod.id] = detail
+
+    favorited: set[int] = set()
+    if user_id is not None and found:
+        favorited = {
+            pid
+            for (pid,) in db.query(Favorite.product_id).filter(
+                Favorite.user_id == user_id, Favorite.product_id.in_(list(found))
+            )
+        }
+
+    return [
+        found[pid].model_copy(update={"is_favorited": pid in favorited})
+        if pid in favorited
+        else found[pid]
+        for pid in product_ids
+        if pid in found
+    ]
+
+
+@router.get("/{product_id}", response_model=ProductDetailOut)
+def product_detail_2(
+    product_id: int,
+    db: Session = Depends(get_db),
+    user_id: int | None = Depends(get_optional_user_id),
+):
+    """
+    Buyer tarafı için product detay:
+    - seller bilgisi
+    - resimler
+    - is_favorited (login olduysa)
+
+    The public part is cached per product id; only the favorite flag is
+    looked up per request.
+    """
+    detail = _detail_cache.get(product_id)
+    if detail is None:
+        detail = _public_detail(db, product_id)
+        if detail is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        _detail_cache.set(product_id, detail)
+
+    if user_id is None:
+        return detail
+
+    is_fav = (
+        db.query(Favorite.id)
+        .filter(Favorite.user_id == user_id, Favorite.product_id == product_id)
+        .first()
+        is not None
     )
+    return detail.model_copy(update={"is_favorited": is_fav})
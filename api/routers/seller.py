@@ -1,22 +1,76 @@
 # api/routers/seller.py — Seller panel endpoints
-from typing import List, Dict, Any, Optional
-import re, os, uuid
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+import asyncio, csv, io, json, re, os
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import ValidationError
+from sqlalchemy import (
+    Integer, Numeric, String, cast, column, func, select, update, values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from ..models.product import SellerProductUpdate
 from ..deps import get_db
 from ..security import get_current_user_id
-from ..models.product import Product
+from ..models.product import Product, product_card_options
+from ..models.category import Category
 from ..models.order import Order, OrderItem
-from ..schemas.product import ProductOut, SellerProductCreate, StockUpdate
+from ..schemas.product import (
+    BulkProductUpdate,
+    BulkProductUpdateOut,
+    ProductImportOut,
+    ProductImportRowError,
+    ProductOut,
+    SellerProductCreate,
+    StockUpdate,
+)
 from ..schemas.order import OrderOut, OrderItemOut
 from ..models.product_image import ProductImage
 from ..schemas.product_image import ProductImageOut
+from ..common.pagination import (
+    decode_id_cursor,
+    encode_cursor,
+    set_next_cursor,
+    split_page,
+)
+from ..common.search import apply_search
+from .products import invalidate_product_detail
 from fastapi import UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+from ..common.uploads import StagedUpload, stage_image_upload
+from backend.apps.catalog.images import (
+    make_variants,
+    variant_paths,
+    variant_pool,
+    variants_exist,
+    variants_for,
+)
+from backend.apps.catalog.media import (
+    FORGET_SQL,
+    MEDIA_PREFIX,
+    RELEASE_SQL,
+    RETAIN_SQL,
+    ContentStore,
+)
+from backend.apps.catalog.slugs import (
+    MAX_ATTEMPTS,
+    MAX_SUFFIX_SQL,
+    MAX_SUFFIXES_SQL,
+    max_suffix_params,
+    slug_after,
+    slugs_after,
+    trim_base,
+)
 
 router = APIRouter(prefix="/seller", tags=["seller"])
 
+SELLER_STATUSES = {"draft", "active", "paused"}
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ROWS = int(os.getenv("PRODUCT_IMPORT_MAX_ROWS", "50000"))
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
 
 
 
@@ -25,13 +79,16 @@ def _slugify(text: str) -> str:
     slug = re.sub(r"[^a-zA-Z0-9]+", "-", text).strip("-").lower()
     return slug or "product"
 
-def _unique_slug(db: Session, base: str) -> str:
-    slug = base
-    i = 1
-    while db.query(Product).filter(Product.slug == slug).first() is not None:
-        i += 1
-        slug = f"{base}-{i}"
-    return slug
+def _allocate_slug(
+    db: Session, base: str, lost: str | None = None, attempt: int = 0
+) -> str:
+    """Next free slug for ``base`` in one query (shared with Django's Product.save)."""
+    max_suffix = (
+        db.connection()
+        .exec_driver_sql(MAX_SUFFIX_SQL, max_suffix_params(base))
+        .scalar()
+    )
+    return slug_after(base, max_suffix, lost, attempt)
 
 def _media_root() -> Path:
     # docker compose kullanıyorsan bunu volume ile eşleştirmen iyi olur (./backend/media gibi)
@@ -50,16 +107,25 @@ def my_products(
     db: Session = Depends(get_db),
     seller_id: int = Depends(get_current_user_id),
     status_in: List[str] | None = Query(None, description="Filter by status values"),
-    q: str | None = Query(None, description="Search in title"),
+    q: str | None = Query(None, description="Full-text search in title and description"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ):
-    query = db.query(Product).filter(Product.seller_id == seller_id)
+    query = (
+        db.query(Product)
+        .options(*product_card_options())
+        .filter(Product.seller_id == seller_id)
+    )
     if status_in:
         query = query.filter(Product.status.in_(status_in))
+    rank = None
     if q:
-        query = query.filter(Product.title.ilike(f"%{q}%"))
-    rows = query.order_by(Product.id.desc()).offset(offset).limit(limit).all()
+        query, rank = apply_search(query, q)
+    if rank is not None:
+        query = query.order_by(rank.desc(), Product.id.desc())
+    else:
+        query = query.order_by(Product.id.desc())
+    rows = query.offset(offset).limit(limit).all()
     return rows
 
 
@@ -70,31 +136,245 @@ def create_product(
     db: Session = Depends(get_db),
     seller_id: int = Depends(get_current_user_id),
 ):
-    allowed = {"draft", "active", "paused"}
-    if payload.status not in allowed:
-        raise HTTPException(400, detail=f"status must be one of {allowed}")
-
-    slug_base = _slugify(payload.title)
-    slug = _unique_slug(db, slug_base)
-
-    prod = Product(
-        seller_id=seller_id,
-        category_id=payload.category_id,
-        title=payload.title,
-        slug=slug,
-        description=payload.description or "",
-        price=payload.price,
-        currency=(payload.currency or "EUR").upper(),
-        stock_quantity=payload.stock_quantity,
-        status=payload.status,
-        is_handmade=payload.is_handmade,
-    )
-    db.add(prod)
+    if payload.status not in SELLER_STATUSES:
+        raise HTTPException(400, detail=f"status must be one of {SELLER_STATUSES}")
+
+    slug_base = trim_base(_slugify(payload.title))
+    slug = None
+    for attempt in range(MAX_ATTEMPTS):
+        slug = _allocate_slug(db, slug_base, lost=slug, attempt=attempt)
+        prod = Product(
+            seller_id=seller_id,
+            category_id=payload.category_id,
+            title=payload.title,
+            slug=slug,
+            description=payload.description or "",
+            price=payload.price,
+            currency=(payload.currency or "EUR").upper(),
+            stock_quantity=payload.stock_quantity,
+            status=payload.status,
+            is_handmade=payload.is_handmade,
+        )
+        # A concurrent create may take the same slug first: retry with a fresh one
+        try:
+            with db.begin_nested():
+                db.add(prod)
+            break
+        except IntegrityError as exc:
+            if attempt == MAX_ATTEMPTS - 1 or "slug" not in str(exc.orig):
+                raise
     db.commit()
     db.refresh(prod)
     return prod
 
 
+# ---------- BULK IMPORT ----------
+def _import_records(
+    upload: UploadFile, fmt: str
+) -> Iterator[Tuple[int, Dict[str, Any] | str]]:
+    """
+    Stream ``(row, record)`` pairs off the spooled upload without reading it
+    into memory. ``record`` is a str when the row could not even be parsed.
+    Empty CSV cells are dropped so the schema defaults apply.
+    """
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for row, rec in enumerate(csv.DictReader(text), start=1):
+            yield row, {
+                k.strip(): v for k, v in rec.items() if k and v not in (None, "")
+            }
+        return
+    for row, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as exc:
+            yield row, f"invalid JSON: {exc}"
+            continue
+        yield row, rec if isinstance(rec, dict) else "expected a JSON object"
+
+
+def _insert_import_chunk(
+    db: Session,
+    seller_id: int,
+    chunk: List[Tuple[int, SellerProductCreate]],
+    max_suffixes: Dict[str, Any],
+    errors: List[ProductImportRowError],
+) -> int:
+    """
+    Insert one chunk of validated rows; returns how many were created.
+
+    One query checks the categories, one finds the highest slug suffix for
+    every new base, and the rows go in as a single multi-row INSERT. Slugs
+    taken concurrently are skipped by ON CONFLICT and re-allocated.
+    """
+    category_ids = {p.category_id for _, p in chunk if p.category_id is not None}
+    if category_ids:
+        known = set(db.scalars(select(Category.id).where(Category.id.in_(category_ids))))
+        for row, p in chunk:
+            if p.category_id is not None and p.category_id not in known:
+                errors.append(
+                    ProductImportRowError(row=row, errors=["category_id: unknown category"])
+                )
+        chunk = [(row, p) for row, p in chunk if p.category_id is None or p.category_id in known]
+
+    pending = [
+        (row, trim_base(_slugify(p.title)), {
+            "seller_id": seller_id,
+            "category_id": p.category_id,
+            "title": p.title,
+            "description": p.description or "",
+            "price": p.price,
+            "currency": (p.currency or "EUR").upper(),
+            "stock_quantity": p.stock_quantity,
+            "status": p.status,
+            "is_handmade": p.is_handmade,
+        })
+        for row, p in chunk
+    ]
+    table = Product.__table__
+    created = 0
+    refresh = {base for _, base, _ in pending if base not in max_suffixes}
+    for _ in range(MAX_ATTEMPTS):
+        if not pending:
+            break
+        if refresh:
+            found = db.connection().exec_driver_sql(
+                MAX_SUFFIXES_SQL, {"bases": sorted(refresh)}
+            )
+            for base, max_suffix in found:
+                # never step back below what this import already handed out
+                max_suffixes[base] = max(int(max_suffix or 0), max_suffixes.get(base) or 0) or None
+        slugs = slugs_after([base for _, base, _ in pending], max_suffixes)
+        for (_, _, values), slug in zip(pending, slugs):
+            values["slug"] = slug
+        stmt = (
+            pg_insert(table)
+            .on_conflict_do_nothing(index_elements=[table.c.slug])
+            .returning(table.c.slug)
+        )
+        inserted = set(db.scalars(stmt, [values for _, _, values in pending]))
+        created += len(inserted)
+        pending = [p for p in pending if p[2]["slug"] not in inserted]
+        refresh = {base for _, base, _ in pending}
+
+    for row, _, _ in pending:
+        errors.append(
+            ProductImportRowError(row=row, errors=["slug: could not allocate a unique slug"])
+        )
+    return created
+
+
+@router.post("/products/import", response_model=ProductImportOut)
+def import_products(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON"),
+    format: Optional[str] = Form(None, description="csv | ndjson (default: from the file name)"),
+    db: Session = Depends(get_db),
+    seller_id: int = Depends(get_current_user_id),
+):
+    """
+    Bulk create products from an uploaded file, one row per product with the
+    same fields as ``POST /seller/products``.
+
+    Valid rows are created and invalid ones are reported by row number; the
+    whole import commits once at the end.
+    """
+    fmt = format or IMPORT_FORMATS.get(Path(file.filename or "").suffix.lower())
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(400, detail="Upload a .csv or .ndjson file (or pass format)")
+
+    created = 0
+    errors: List[ProductImportRowError] = []
+    max_suffixes: Dict[str, Any] = {}
+    chunk: List[Tuple[int, SellerProductCreate]] = []
+    try:
+        for row, rec in _import_records(file, fmt):
+            if row > IMPORT_MAX_ROWS:
+                raise HTTPException(413, detail=f"At most {IMPORT_MAX_ROWS} rows per import")
+            if isinstance(rec, str):
+                errors.append(ProductImportRowError(row=row, errors=[rec]))
+                continue
+            try:
+                payload = SellerProductCreate.model_validate(rec)
+            except ValidationError as exc:
+                errors.append(ProductImportRowError(row=row, errors=[
+                    f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+                    for e in exc.errors()
+                ]))
+                continue
+            if payload.status not in SELLER_STATUSES:
+                errors.append(ProductImportRowError(
+                    row=row, errors=[f"status: must be one of {sorted(SELLER_STATUSES)}"]
+                ))
+                continue
+            chunk.append((row, payload))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                created += _insert_import_chunk(db, seller_id, chunk, max_suffixes, errors)
+                chunk = []
+        if chunk:
+            created += _insert_import_chunk(db, seller_id, chunk, max_suffixes, errors)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(400, detail=f"Could not read {fmt} file: {exc}")
+
+    db.commit()
+    errors.sort(key=lambda e: e.row)
+    return ProductImportOut(created=created, failed=len(errors), errors=errors)
+
+
+# ---------- BULK UPDATE ----------
+@router.patch("/products/bulk", response_model=BulkProductUpdateOut)
+def bulk_update_products(
+    payload: BulkProductUpdate,
+    db: Session = Depends(get_db),
+    seller_id: int = Depends(get_current_user_id),
+):
+    """
+    Set price / stock / status on many of the seller's products at once.
+
+    Omitted fields keep their value. Everything is applied by one
+    ``UPDATE ... FROM (VALUES ...)`` scoped to the seller, so ids that are
+    not theirs are silently skipped; the response lists what was updated.
+    """
+    ids = [item.id for item in payload.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(400, detail="Duplicate product ids in batch")
+    bad = {i.status for i in payload.items if i.status is not None} - SELLER_STATUSES
+    if bad:
+        raise HTTPException(400, detail=f"status must be one of {SELLER_STATUSES}")
+
+    # id order keeps row locks in a stable order across concurrent syncs
+    rows = sorted(
+        ((i.id, i.price, i.stock_quantity, i.status) for i in payload.items),
+        key=lambda r: r[0],
+    )
+    changes = values(
+        column("id", Integer),
+        column("price", Numeric(12, 2)),
+        column("stock_quantity", Integer),
+        column("status", String(10)),
+        name="changes",
+    ).data(rows)
+    # a VALUES column that is all NULL comes out as text: cast explicitly
+    price = cast(changes.c.price, Numeric(12, 2))
+    stock = cast(changes.c.stock_quantity, Integer)
+    new_status = cast(changes.c.status, String(10))
+    updated = db.scalars(
+        update(Product)
+        .where(Product.id == changes.c.id, Product.seller_id == seller_id)
+        .values(
+            price=func.coalesce(price, Product.price),
+            stock_quantity=func.coalesce(stock, Product.stock_quantity),
+            status=func.coalesce(new_status, Product.status),
+        )
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    invalidate_product_detail(*updated)
+    return BulkProductUpdateOut(updated=sorted(updated))
+
+
 @router.patch("/products/{product_id}", response_model=ProductOut)
 def update_product_minimal(
     product_id: int,
@@ -118,6 +398,7 @@ def update_product_minimal(
         if k in allowed:
             setattr(prod, k, v)
     db.commit()
+    invalidate_product_detail(prod.id)
     db.refresh(prod)
     return prod
 
@@ -159,6 +440,7 @@ def replace_product(
     prod.is_handmade = payload.is_handmade
 
     db.commit()
+    invalidate_product_detail(prod.id)
     db.refresh(prod)
     return prod
 
@@ -181,6 +463,7 @@ def update_stock(
 
     prod.stock_quantity = payload.stock_quantity
     db.commit()
+    invalidate_product_detail(prod.id)
     db.refresh(prod)
     return prod
 
@@ -188,12 +471,59 @@ def update_stock(
 
 
 
+def _owned_product_exists(db: Session, product_id: int, seller_id: int) -> bool:
+    return (
+        db.query(Product.id)
+        .filter(Product.id == product_id, Product.seller_id == seller_id)
+        .first()
+        is not None
+    )
+
+
+def _retain_media(db: Session, store: ContentStore, staged: StagedUpload, rel: str) -> int:
+    """Take a reference on ``rel`` (row-locked until commit), then put the bytes there."""
+    refcount = db.connection().exec_driver_sql(RETAIN_SQL, {"path": rel}).scalar()
+    store.place(staged.path, rel)
+    return refcount
+
+
+def _release_media(db: Session, store: ContentStore, rel: str, variants: dict) -> None:
+    """Drop a reference; the last one unlinks the file before the lock is released."""
+    conn = db.connection()
+    remaining = conn.exec_driver_sql(RELEASE_SQL, {"path": rel}).scalar()
+    if remaining is None or remaining <= 0:
+        conn.exec_driver_sql(FORGET_SQL, {"path": rel})
+        store.remove(rel, *variant_paths(variants))
+
+
+def _abandon_upload(
+    db: Session, store: ContentStore, rel: str, variants: dict, owned: bool
+) -> None:
+    # unlink while our blob row lock is still held, so a concurrent upload of
+    # the same bytes can't see the file and then lose it
+    if owned:
+        store.remove(rel, *variant_paths(variants))
+    db.rollback()
+
+
+def _add_product_image(
+    db: Session, product_id: int, image: str, variants: dict, alt: str, position: int
+) -> ProductImage:
+    img = ProductImage(
+        product_id=product_id, image=image, variants=variants, alt=alt, position=position
+    )
+    db.add(img)
+    db.commit()
+    db.refresh(img)
+    return img
+
+
 @router.post(
     "/products/{product_id}/images",
     response_model=ProductImageOut,
     status_code=201
 )
-def upload_product_image(
+async def upload_product_image(
     product_id: int,
     file: UploadFile = File(...),
     alt: Optional[str] = Form(None),
@@ -201,41 +531,48 @@ def upload_product_image(
     db: Session = Depends(get_db),
     seller_id: int = Depends(get_current_user_id),
 ):
+    """
+    Attach an image to one of the seller's products.
+
+    The upload is streamed to disk in chunks (see ``api.common.uploads``)
+    and stored under its content hash, so re-uploading the same photo reuses
+    the existing file and variants (``catalog.media``). New derivatives are
+    rendered in the image process pool, and the blocking DB calls run in the
+    threadpool so the event loop stays free.
+    """
     # ürün satıcıya ait mi?
-    prod = (
-        db.query(Product)
-        .filter(Product.id == product_id, Product.seller_id == seller_id)
-        .first()
-    )
-    if not prod:
+    if not await run_in_threadpool(_owned_product_exists, db, product_id, seller_id):
         raise HTTPException(404, detail="Product not found or not yours")
 
-    # uzantı güvenli mi?
-    ext = (Path(file.filename or "").suffix or "").lower()
-    allowed_ext = {".jpg", ".jpeg", ".png", ".webp"}
-    if ext not in allowed_ext:
-        raise HTTPException(400, detail="Only .jpg, .jpeg, .png, .webp allowed")
-
     media_root = _media_root()
-    filename = f"{uuid.uuid4().hex}{ext}"
-    rel_path = Path("products") / filename
-    abs_path = media_root / rel_path
-
-    # kaydet
-    content = file.file.read()
-    with abs_path.open("wb") as f:
-        f.write(content)
-
+    store = ContentStore(media_root)
+    staged = await stage_image_upload(file, media_root / MEDIA_PREFIX)
     # DB kaydı (Django ImageField gibi relative path saklıyoruz)
-    img = ProductImage(
-        product_id=product_id,
-        image=str(rel_path).replace("\\", "/"),
-        alt=alt or "",
-        position=int(position or 0),
-    )
-    db.add(img)
-    db.commit()
-    db.refresh(img)
+    rel_path = store.path_for(staged.digest, staged.ext)
+    variants = variants_for(rel_path)
+    owned = False
+    try:
+        # refcount 1: nobody else has these bytes, the file and variants are ours
+        owned = await run_in_threadpool(_retain_media, db, store, staged, rel_path) == 1
+        if not variants_exist(str(media_root), variants):
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    variant_pool(), make_variants, str(media_root), rel_path
+                )
+            except Image.DecompressionBombError:
+                raise HTTPException(413, detail="Image has too many pixels")
+            except OSError:
+                # right magic bytes, but Pillow cannot decode the rest
+                raise HTTPException(400, detail="Image file is corrupt or unsupported")
+        img = await run_in_threadpool(
+            _add_product_image,
+            db, product_id, rel_path, variants, alt or "", int(position or 0),
+        )
+    except BaseException:
+        staged.path.unlink(missing_ok=True)
+        await run_in_threadpool(_abandon_upload, db, store, rel_path, variants, owned)
+        raise
+    invalidate_product_detail(product_id)
     return img
 
 
@@ -250,36 +587,98 @@ def upload_product_image(
 
 
 # ---------- ORDERS (seller view) ----------
+def _seller_orders(
+    db: Session,
+    seller_id: int,
+    *,
+    order_status: List[str] | None = None,
+    order_id: int | None = None,
+    before_id: int | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> List[OrderOut]:
+    """
+    Orders containing this seller's products, each with only the seller's
+    own items, newest first.
+
+    One round trip: the page of order ids is a subquery over the seller's
+    item rows, joined back to orders and items. Results are built as
+    OrderOut directly so the ORM ``Order.items`` collection is never touched.
+    """
+    page = (
+        select(OrderItem.order_id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Product.seller_id == seller_id)
+        .group_by(OrderItem.order_id)
+        .order_by(OrderItem.order_id.desc())
+    )
+    if order_status:
+        page = page.where(Order.status.in_(order_status))
+    if order_id is not None:
+        page = page.where(OrderItem.order_id == order_id)
+    if before_id is not None:
+        page = page.where(OrderItem.order_id < before_id)
+    if offset:
+        page = page.offset(offset)
+    if limit is not None:
+        page = page.limit(limit)
+    page = page.subquery()
+
+    rows = (
+        db.query(Order, OrderItem)
+        .join(page, page.c.order_id == Order.id)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .filter(Product.seller_id == seller_id)
+        .order_by(Order.id.desc(), OrderItem.id.asc())
+        .all()
+    )
+
+    orders: Dict[int, OrderOut] = {}
+    for order, item in rows:
+        out = orders.get(order.id)
+        if out is None:
+            out = orders[order.id] = OrderOut(
+                id=order.id,
+                status=order.status,
+                subtotal=order.subtotal,
+                shipping=order.shipping,
+                total=order.total,
+                created_at=order.created_at,
+                shipping_snapshot=order.shipping_snapshot or {},
+                items=[],
+            )
+        out.items.append(OrderItemOut.model_validate(item))
+    return list(orders.values())
+
+
 @router.get("/orders", response_model=List[OrderOut])
 def seller_orders(
+    response: Response,
     db: Session = Depends(get_db),
     seller_id: int = Depends(get_current_user_id),
     order_status: List[str] | None = Query(None, description="Filter orders by status"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(
+        None, description="Opaque X-Next-Cursor value from the previous page"
+    ),
 ):
-    # Fetch orders that include at least one item from this seller
-    q = (
-        db.query(Order)
-        .join(OrderItem, OrderItem.order_id == Order.id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .filter(Product.seller_id == seller_id)
+    """Seller inbox: orders with at least one of this seller's items."""
+    orders, has_more = split_page(
+        _seller_orders(
+            db,
+            seller_id,
+            order_status=order_status,
+            before_id=decode_id_cursor(cursor) if cursor else None,
+            offset=0 if cursor else offset,
+            limit=limit + 1,
+        ),
+        limit,
     )
-    if order_status:
-        q = q.filter(Order.status.in_(order_status))
-
-    orders = q.distinct().order_by(Order.id.desc()).offset(offset).limit(limit).all()
-
-    # For each order, keep only items belonging to this seller in response
-    for o in orders:
-        seller_items = (
-            db.query(OrderItem)
-            .join(Product, Product.id == OrderItem.product_id)
-            .filter(OrderItem.order_id == o.id, Product.seller_id == seller_id)
-            .all()
-        )
-        # attach filtered items for Pydantic serialization
-        o.items = seller_items  # type: ignore[attr-defined]
+    if has_more:
+        set_next_cursor(response, encode_cursor(id=orders[-1].id))
     return orders
 
 
@@ -289,25 +688,10 @@ def seller_order_detail(
     db: Session = Depends(get_db),
     seller_id: int = Depends(get_current_user_id),
 ):
-    # Ensure order contains this seller's items
-    o = (
-        db.query(Order)
-        .join(OrderItem, OrderItem.order_id == Order.id)
-        .join(Product, Product.id == OrderItem.product_id)
-        .filter(Order.id == order_id, Product.seller_id == seller_id)
-        .first()
-    )
-    if not o:
+    orders = _seller_orders(db, seller_id, order_id=order_id)
+    if not orders:
         raise HTTPException(status_code=404, detail="Order not found")
-
-    seller_items = (
-        db.query(OrderItem)
-        .join(Product, Product.id == OrderItem.product_id)
-        .filter(OrderItem.order_id == o.id, Product.seller_id == seller_id)
-        .all()
-    )
-    o.items = seller_items  # type: ignore[attr-defined]
-    return o
+    return orders[0]
 
 
 @router.get("/products/{product_id}/images", response_model=List[ProductImageOut])
@@ -360,20 +744,10 @@ def delete_product_image(
     if not img:
         raise HTTPException(status_code=404, detail="Image not found")
     
-    # 1) Dosyayı diskten sil (güvenli path kontrolüyle)
-    media_root = _media_root()
-    rel = Path(img.image)  # örn: products/abc.jpg
-
-    # path traversal engeli: resolve edilen yol media_root içinde olmalı
-    abs_path = (media_root / rel).resolve()
-    if str(abs_path).startswith(str(media_root.resolve())):
-        try:
-            if abs_path.exists() and abs_path.is_file():
-                abs_path.unlink()
-        except Exception:
-            # Dosya silinemezse DB silmeyi engellemiyoruz (istersen burada 500 de atabiliriz)
-            pass
-
     db.delete(img)
+    db.flush()
+    # Dosya yalnızca son referans gidince diskten silinir
+    _release_media(db, ContentStore(_media_root()), img.image, img.variants)
     db.commit()
+    invalidate_product_detail(product_id)
     return None
@@ -28,8 +28,30 @@ class OrderOut(BaseModel):
         from_attributes = True
 
 
+class OrderSummaryOut(BaseModel):
+    id: int
+    status: str
+    total: Decimal
+    item_count: int
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
 class OrderCreateQuick(BaseModel):
     product_id: int
     quantity: int = Field(ge=1, default=1)
     address_id: Optional[int] = None
     shipping: Decimal = Field(default=0, ge=0)
+
+
+class CartLine(BaseModel):
+    product_id: int
+    quantity: int = Field(ge=1, default=1)
+
+
+class CartCheckout(BaseModel):
+    items: List[CartLine] = Field(min_length=1, max_length=100)
+    address_id: Optional[int] = None
+    shipping: Decimal = Field(default=0, ge=0)
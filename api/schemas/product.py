@@ -71,4 +71,30 @@ class SellerProductCreate(BaseModel):
 
 
 class StockUpdate(BaseModel):
-    stock_quantity: int = Field(..., ge=0)
\ No newline at end of file
+    stock_quantity: int = Field(..., ge=0)
+
+
+class BulkProductUpdateItem(BaseModel):
+    id: int
+    price: Optional[Decimal] = Field(None, ge=0, max_digits=12, decimal_places=2)
+    stock_quantity: Optional[int] = Field(None, ge=0)
+    status: Optional[str] = None   # draft/active/paused
+
+
+class BulkProductUpdate(BaseModel):
+    items: List[BulkProductUpdateItem] = Field(min_length=1, max_length=1000)
+
+
+class BulkProductUpdateOut(BaseModel):
+    updated: List[int]   # ids that belong to the seller and were changed
+
+
+class ProductImportRowError(BaseModel):
+    row: int   # 1-based: CSV data row (header excluded) / NDJSON line
+    errors: List[str]
+
+
+class ProductImportOut(BaseModel):
+    created: int
+    failed: int
+    errors: List[ProductImportRowError] = []
@@ -1,6 +1,6 @@
 # api/schemas/product_image.py
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 
 class ProductImageOut(BaseModel):
@@ -9,6 +9,8 @@ class ProductImageOut(BaseModel):
     image: str
     alt: Optional[str] = None
     position: int
+    # size name -> format ("webp"/"jpeg") -> path relative to /media
+    variants: Dict[str, Dict[str, str]] = {}
 
     class Config:
         from_attributes = True
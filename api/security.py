@@ -1,22 +1,43 @@
 # api/security.py
+import hashlib
+import logging
 import os
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
+from uuid import uuid4
 
 import jwt  # PyJWT
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import exists, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from . import django_compat  # noqa: F401  # ensure Django is initialized
-from django.contrib.auth.hashers import check_password, make_password
-
-from .deps import get_db
+from .common.cache import TTLCache, VersionedSnapshot
+from .common.executor import BoundedExecutor, Overloaded
+from .common.passwords import check_password, make_password, needs_rehash
+from .deps import SessionLocal, get_db
+from .models.revoked_token import RevokedToken, RevokedTokenVersion
 from .models.user import User
 
+logger = logging.getLogger(__name__)
+
 JWT_SECRET = os.getenv("JWT_SECRET", os.getenv("DJANGO_SECRET_KEY", "dev-secret"))
 JWT_ALG = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRE_MIN = int(os.getenv("JWT_EXPIRE_MIN", "120"))  # 2 hours default
+JWT_REFRESH_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_EXPIRE_DAYS", "30"))
+
+# PBKDF2 runs hundreds of thousands of iterations per call. hashlib releases
+# the GIL while it does, so a dedicated thread pool hashes in parallel without
+# touching the threadpool every other endpoint runs on.
+password_hasher = BoundedExecutor(
+    "password-hash",
+    workers=int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("PASSWORD_HASH_QUEUE", "32")),
+    max_wait=float(os.getenv("PASSWORD_HASH_MAX_WAIT", "2.0")),
+)
 
 
 def create_access_token(
@@ -34,8 +55,41 @@ def create_access_token(
     return token
 
 
+def create_refresh_token(
+    *, user_id: int, family: Optional[str] = None, expires_days: int = JWT_REFRESH_EXPIRE_DAYS
+) -> str:
+    """
+    Single-use token for ``/auth/refresh``. ``jti`` identifies this token and
+    ``fam`` the chain of rotations it belongs to, starting at a login.
+    """
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": str(user_id),
+        "jti": uuid4().hex,
+        "fam": family or uuid4().hex,
+        "iat": int(now.timestamp()),
+        "exp": int((now + timedelta(days=expires_days)).timestamp()),
+        "type": "refresh",
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
+
+
+def decode_refresh_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(
+            token, JWT_SECRET, algorithms=[JWT_ALG], options={"require": ["exp", "sub"]}
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Refresh token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return payload
+
+
 def verify_password(plain: str, hashed: str) -> bool:
-    # Use Django's password hasher to verify against auth_user.password
+    # Django-compatible check against auth_user.password (no django.setup())
     return check_password(plain, hashed)
 
 
@@ -43,75 +97,251 @@ def hash_password(plain: str) -> str:  # ⬅️ YENİ: Django ile uyumlu hash
     return make_password(plain)
 
 
-def authenticate_user(
+async def run_password_hasher(fn, *args):
+    """Run ``verify_password``/``hash_password`` on the bounded hashing pool."""
+    try:
+        return await password_hasher.run(fn, *args)
+    except Overloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+def credential_filter(username: str, email: str):
+    """
+    ``username = :username OR lower(email) = lower(:email)``; Postgres ORs
+    the username unique index with ``idx_auth_user_email_lower`` (users 0003).
+    """
+    return or_(User.username == username, func.lower(User.email) == func.lower(email))
+
+
+def find_login_user(db: Session, username_or_email: str) -> Optional[User]:
+    # one round trip; an exact username match wins over someone's email
+    return (
+        db.query(User)
+        .filter(credential_filter(username_or_email, username_or_email))
+        .order_by((User.username == username_or_email).desc(), User.id)
+        .first()
+    )
+
+
+async def authenticate_user(
     db: Session, username_or_email: str, password: str
 ) -> Optional[User]:
-    q = db.query(User)
-    user = (
-        q.filter(User.username == username_or_email).first()
-        or q.filter(User.email == username_or_email).first()
-    )
+    user = await run_in_threadpool(find_login_user, db, username_or_email)
     if not user:
         return None
     if not user.is_active:
         return None
-    if not verify_password(password, user.password):
+    if not await run_password_hasher(verify_password, password, user.password):
         return None
+    if needs_rehash(user.password):
+        await _upgrade_password_hash(db, user, password)
     return user
 
 
+def _store_password_hash(db: Session, user: User, encoded: str) -> None:
+    user.password = encoded
+    db.commit()
+
+
+async def _upgrade_password_hash(db: Session, user: User, password: str) -> None:
+    """Re-encode an old-format hash at login, like Django's check_password setter."""
+    try:
+        encoded = await password_hasher.run(hash_password, password)
+    except Overloaded:
+        return  # best effort: the next login will try again
+    await run_in_threadpool(_store_password_hash, db, user, encoded)
+
+
 # ----- FastAPI dependency to read Bearer token -----
-_bearer = HTTPBearer(auto_error=False)
+bearer_scheme = HTTPBearer(auto_error=False)
 
+# Verified tokens, keyed by SHA-256 of the raw token, mapped to
+# (user_id, exp). An entry never outlives its token's ``exp``.
+_verified_tokens = TTLCache(
+    maxsize=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("JWT_CACHE_TTL", "300")),
+)
+_revocation_checks: List[Callable[[str, int], bool]] = []
 
-def get_current_user_id(creds: HTTPAuthorizationCredentials = Depends(_bearer)) -> int:
-    if creds is None or not creds.credentials:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token"
+
+def add_revocation_check(check: Callable[[str, int], bool]) -> None:
+    """
+    Register ``check(token_digest, user_id) -> bool``; True rejects the token.
+
+    Checks run on every authenticated request, cached token or not, so they
+    must be in-memory lookups.
+    """
+    _revocation_checks.append(check)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# users_revoked_token.kind
+REVOKED_REFRESH = "refresh"  # spent by rotation; checked by the insert only
+REVOKED_SESSION = "session"  # every refresh token of a login ("fam")
+REVOKED_ACCESS = "access"  # one access token, by token_digest()
+
+
+def _load_revocation_version() -> int:
+    with SessionLocal() as db:
+        return (
+            db.query(RevokedTokenVersion.version)
+            .filter(RevokedTokenVersion.id == 1)
+            .scalar()
+            or 0
+        )
+
+
+def _build_revoked_set() -> frozenset:
+    with SessionLocal() as db:
+        rows = db.query(RevokedToken.token_id).filter(
+            RevokedToken.kind != REVOKED_REFRESH, RevokedToken.expires_at > func.now()
         )
-    token = creds.credentials
+        return frozenset(token_id for (token_id,) in rows)
+
+
+# Unexpired revoked sessions and access tokens, rebuilt when one is added
+# (users_revoked_token_version moves), so a revocation check is a set lookup.
+# The worker that revokes refreshes at once; others within
+# TOKEN_REVOCATION_CHECK_INTERVAL.
+revoked_tokens = VersionedSnapshot(
+    _load_revocation_version,
+    _build_revoked_set,
+    check_interval=float(os.getenv("TOKEN_REVOCATION_CHECK_INTERVAL", "5")),
+)
+
+
+def revoke_tokens(
+    db: Session, kind: str, user_id: int, expires_at: datetime, *token_ids: str
+) -> List[str]:
+    """
+    Record ``token_ids`` as revoked and return the ones that were not
+    already. ``expires_at`` is when they would stop working anyway. The
+    caller commits, then calls ``revoked_tokens.refresh()`` for anything
+    but ``REVOKED_REFRESH``.
+    """
+    inserted = db.execute(
+        pg_insert(RevokedToken)
+        .values([
+            {"token_id": t, "kind": kind, "user_id": user_id, "expires_at": expires_at}
+            for t in token_ids
+        ])
+        .on_conflict_do_nothing(index_elements=[RevokedToken.token_id])
+        .returning(RevokedToken.token_id)
+    ).scalars().all()
+    if inserted and kind != REVOKED_REFRESH:
+        # in the same transaction, and its row lock orders the revoking
+        # commits: each one is a new version for the other workers
+        db.query(RevokedTokenVersion).filter(RevokedTokenVersion.id == 1).update(
+            {RevokedTokenVersion.version: RevokedTokenVersion.version + 1},
+            synchronize_session=False,
+        )
+    return inserted
+
+
+def is_revoked(db: Session, token_id: str) -> bool:
+    """Authoritative (database) counterpart of ``token_id in revoked_tokens.peek()``."""
+    return db.query(exists().where(RevokedToken.token_id == token_id)).scalar()
+
+
+def warm_revoked_tokens() -> None:
+    """Build the revocation snapshot before serving (app startup); never raises."""
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+        revoked_tokens.refresh()
+    except Exception:
+        logger.exception("Could not build the token revocation snapshot, will retry")
+
+
+_unbuilt_warned_at: Optional[float] = None
+
+
+def _revoked_digests() -> frozenset:
+    # never builds on the event loop; the snapshot is only missing when the
+    # startup build failed, and then no revocations are known until it works
+    revoked = revoked_tokens.peek()
+    if revoked is not None:
+        return revoked
+    global _unbuilt_warned_at
+    now = time.monotonic()
+    if _unbuilt_warned_at is None or now - _unbuilt_warned_at >= revoked_tokens.check_interval:
+        _unbuilt_warned_at = now
+        logger.warning("Token revocation snapshot not built: revoked access tokens are accepted")
+    return frozenset()
+
+
+add_revocation_check(lambda digest, user_id: digest in _revoked_digests())
+
+
+def decode_access_token(token: str, *, allow_expired: bool = False) -> Tuple[int, Optional[int]]:
+    """Check an access token's signature and claims; return ``(user_id, exp)``."""
+    try:
+        payload = jwt.decode(
+            token, JWT_SECRET, algorithms=[JWT_ALG], options={"verify_exp": not allow_expired}
+        )
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
     sub = payload.get("sub")
-    if not sub:
+    if not sub or payload.get("type", "access") != "access":
         raise HTTPException(status_code=401, detail="Invalid token payload")
     try:
-        return int(sub)
+        user_id = int(sub)
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid subject in token")
+    return user_id, int(payload["exp"]) if "exp" in payload else None
 
 
-_optional_bearer = HTTPBearer(auto_error=False)
+def _verify_token(token: str, digest: str) -> Tuple[int, Optional[int]]:
+    user_id, exp = decode_access_token(token)
+    ttl = _verified_tokens.ttl if exp is None else min(_verified_tokens.ttl, exp - time.time())
+    if ttl > 0:
+        _verified_tokens.set(digest, (user_id, exp), ttl=ttl)
+    return user_id, exp
 
 
-def get_optional_user_id(
-    creds: Optional[HTTPAuthorizationCredentials] = Depends(_optional_bearer),
+async def get_optional_user_id(
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ) -> Optional[int]:
     """
-    Token varsa decode et, yoksa None döndür.
-    Product detail gibi public endpoint'lerde kullanacağız.
+    Token varsa doğrula ve kullanıcı id'sini döndür, yoksa None.
+    Product detail gibi public endpoint'lerde kullanacağız; bozuk ya da
+    süresi dolmuş token yine 401.
+
+    A token seen before costs a hash and a dict lookup instead of a
+    signature check.
     """
     if creds is None or not creds.credentials:
         return None
 
-    token = creds.credentials
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-    except jwt.ExpiredSignatureError:
-        # Burada istersen 401 da atabilirsin; ben şimdilik 'token varsa ama bozuksa' 401 diyorum:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    digest = token_digest(creds.credentials)
+    cached = _verified_tokens.get(digest)
+    if cached is None:
+        user_id, exp = _verify_token(creds.credentials, digest)
+    else:
+        user_id, exp = cached
+        if exp is not None and exp <= time.time():
+            # the TTL is monotonic-clock based; exp is authoritative
+            _verified_tokens.delete(digest)
+            raise HTTPException(status_code=401, detail="Token expired")
 
-    sub = payload.get("sub")
-    if not sub:
-        raise HTTPException(status_code=401, detail="Invalid token payload")
-    try:
-        return int(sub)
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Invalid subject in token")
+    if any(check(digest, user_id) for check in _revocation_checks):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return user_id
+
+
+async def get_current_user_id(
+    user_id: Optional[int] = Depends(get_optional_user_id),
+) -> int:
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token"
+        )
+    return user_id
@@ -0,0 +1,214 @@
+# api/tests/conftest.py
+"""
+Fixtures for tests that need the real schema (Django-migrated Postgres).
+
+Point the usual POSTGRES_* variables at a database with ``manage.py
+migrate`` applied; without one every test here is skipped. Rows are created
+under a random prefix and deleted again afterwards, so a development
+database can be used.
+"""
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from api.common.passwords import make_password
+from api.deps import SessionLocal, engine
+from api.models.category import Category, CategoryClosure
+from api.models.order import Order, OrderItem
+from api.models.product import Product
+from api.models.product_image import ProductImage
+from api.models.revoked_token import RevokedToken
+from api.models.user import SellerProfile, User
+from api.security import create_access_token
+
+REQUIRED_TABLES = {
+    "auth_user",
+    "profiles_seller",
+    "catalog_category",
+    "catalog_category_closure",
+    "catalog_product",
+    "catalog_productimage",
+    "catalog_mediablob",
+    "orders_order",
+    "orders_orderitem",
+    "users_revoked_token",
+    "users_revoked_token_version",
+}
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as conn:
+            tables = set(inspect(conn).get_table_names())
+    except OperationalError:
+        pytest.skip("no Postgres configured (POSTGRES_* environment variables)")
+    missing = REQUIRED_TABLES - tables
+    if missing:
+        pytest.skip(f"database is not migrated (missing {', '.join(sorted(missing))})")
+    return engine
+
+
+@pytest.fixture
+def client(database):
+    from api.app import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement sent to the database inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class Catalog:
+    """Creates users, sellers, categories and products; ``cleanup`` removes them."""
+
+    def __init__(self):
+        self.prefix = uuid.uuid4().hex[:8]
+        self.db = SessionLocal()
+        self.user_ids = []
+        self.category_ids = []
+        self.product_count = 0
+
+    def user(self, name: str, seller: bool = False, password: str | None = None) -> User:
+        now = datetime.now(timezone.utc)
+        user = User(
+            username=f"{self.prefix}-{name}",
+            email=f"{self.prefix}-{name}@example.com",
+            password=make_password(password) if password else "!",
+            date_joined=now,
+        )
+        self.db.add(user)
+        self.db.flush()
+        if seller:
+            self.db.add(SellerProfile(
+                user_id=user.id,
+                shop_name=f"{self.prefix}-{name}-shop",
+                bio="",
+                location="MARY WELAYATY",
+                phone_number="1",
+                created_at=now,
+                updated_at=now,
+            ))
+        self.db.commit()
+        self.user_ids.append(user.id)
+        return user
+
+    def category(self, name: str, parent: Category | None = None) -> Category:
+        category = Category(
+            name=name,
+            slug=f"{self.prefix}-{name.lower()}",
+            parent_id=parent.id if parent is not None else None,
+        )
+        self.db.add(category)
+        self.db.flush()
+        # the rows Category.save would rebuild on the Django side
+        self.db.add(CategoryClosure(
+            ancestor_id=category.id, descendant_id=category.id, depth=0
+        ))
+        if parent is not None:
+            for ancestor_id, depth in self.db.query(
+                CategoryClosure.ancestor_id, CategoryClosure.depth
+            ).filter(CategoryClosure.descendant_id == parent.id):
+                self.db.add(CategoryClosure(
+                    ancestor_id=ancestor_id, descendant_id=category.id, depth=depth + 1
+                ))
+        self.db.commit()
+        self.category_ids.append(category.id)
+        return category
+
+    def products(self, seller: User, category: Category, count: int,
+                 stock: int = 5, images: int = 0) -> list[Product]:
+        products = [
+            Product(
+                seller_id=seller.id,
+                category_id=category.id,
+                title=f"Silver ring {i}",
+                slug=f"{self.prefix}-{self.product_count + i}",
+                description="handmade",
+                price=10 + i,
+                stock_quantity=stock,
+                status="active",
+            )
+            for i in range(count)
+        ]
+        self.product_count += count
+        self.db.add_all(products)
+        self.db.flush()
+        for product in products:
+            for position in range(images):
+                self.db.add(ProductImage(
+                    product_id=product.id,
+                    image=f"products/{self.prefix}-{product.id}-{position}.jpg",
+                    alt="",
+                    position=position,
+                ))
+        self.db.commit()
+        return products
+
+    def headers(self, user: User) -> dict:
+        token = create_access_token(user_id=user.id, username=user.username)
+        return {"Authorization": f"Bearer {token}"}
+
+    def cleanup(self):
+        db = self.db
+        db.rollback()
+        product_ids = [
+            pid for (pid,) in
+            db.query(Product.id).filter(Product.seller_id.in_(self.user_ids))
+        ]
+        order_ids = [
+            oid for (oid,) in
+            db.query(Order.id).filter(Order.buyer_id.in_(self.user_ids))
+        ]
+        db.query(OrderItem).filter(
+            OrderItem.order_id.in_(order_ids) | OrderItem.product_id.in_(product_ids)
+        ).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        images = db.query(ProductImage).filter(ProductImage.product_id.in_(product_ids))
+        media = [path for (path,) in images.with_entities(ProductImage.image)]
+        images.delete(synchronize_session=False)
+        db.execute(
+            text("DELETE FROM catalog_mediablob WHERE path = ANY(:paths)"), {"paths": media}
+        )
+        db.query(Product).filter(Product.id.in_(product_ids)).delete(synchronize_session=False)
+        db.query(CategoryClosure).filter(
+            CategoryClosure.descendant_id.in_(self.category_ids)
+        ).delete(synchronize_session=False)
+        db.query(Category).filter(Category.id.in_(self.category_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(SellerProfile).filter(
+            SellerProfile.user_id.in_(self.user_ids)
+        ).delete(synchronize_session=False)
+        db.query(RevokedToken).filter(
+            RevokedToken.user_id.in_(self.user_ids)
+        ).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(self.user_ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+@pytest.fixture
+def catalog(database):
+    catalog = Catalog()
+    yield catalog
+    catalog.cleanup()
@@ -0,0 +1,197 @@
+# api/tests/test_auth_tokens.py — refresh-token rotation and revocation
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import jwt
+
+from api import security
+from api.deps import SessionLocal
+from api.models.revoked_token import RevokedToken
+from api.security import (
+    JWT_ALG,
+    JWT_SECRET,
+    REVOKED_ACCESS,
+    REVOKED_SESSION,
+    create_access_token,
+    create_refresh_token,
+    revoke_tokens,
+    revoked_tokens,
+    token_digest,
+)
+
+
+def _claims(token: str) -> dict:
+    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _revocations(catalog, user):
+    catalog.db.rollback()  # see other sessions' commits
+    return {
+        (r.kind, r.token_id)
+        for r in catalog.db.query(RevokedToken).filter(RevokedToken.user_id == user.id)
+    }
+
+
+def test_login_returns_an_access_and_a_refresh_token(client, catalog):
+    user = catalog.user("buyer", password="s3cret-pass")
+
+    response = client.post(
+        "/auth/login", json={"username_or_email": user.username, "password": "s3cret-pass"}
+    )
+
+    assert response.status_code == 200
+    tokens = response.json()
+    access, refresh = _claims(tokens["access_token"]), _claims(tokens["refresh_token"])
+    assert (access["type"], access["sub"]) == ("access", str(user.id))
+    assert (refresh["type"], refresh["sub"]) == ("refresh", str(user.id))
+    assert refresh["jti"] and refresh["fam"]
+    assert client.get("/favorites", headers=_bearer(tokens["access_token"])).status_code == 200
+
+
+def test_refresh_rotates_and_a_replay_ends_the_session(client, catalog):
+    user = catalog.user("buyer")
+    first = create_refresh_token(user_id=user.id)
+
+    response = client.post("/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert _claims(second)["fam"] == _claims(first)["fam"]
+    assert _claims(second)["jti"] != _claims(first)["jti"]
+
+    # the first token was stolen and is played again: nobody may continue
+    replay = client.post("/auth/refresh", json={"refresh_token": first})
+    assert replay.status_code == 401
+    assert (REVOKED_SESSION, _claims(first)["fam"]) in _revocations(catalog, user)
+    assert client.post("/auth/refresh", json={"refresh_token": second}).status_code == 401
+
+
+def test_only_one_of_concurrent_refreshes_wins(client, catalog):
+    token = create_refresh_token(user_id=catalog.user("buyer").id)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(
+            lambda _: client.post("/auth/refresh", json={"refresh_token": token}).status_code,
+            range(8),
+        ))
+
+    assert statuses.count(200) == 1
+    assert statuses.count(401) == 7
+
+
+def test_logout_revokes_the_session_and_the_bearer_token(client, catalog):
+    user = catalog.user("buyer")
+    access = create_access_token(user_id=user.id, username=user.username)
+    refresh = create_refresh_token(user_id=user.id)
+    assert client.get("/favorites", headers=_bearer(access)).status_code == 200  # now cached
+
+    response = client.post(
+        "/auth/logout", json={"refresh_token": refresh}, headers=_bearer(access)
+    )
+
+    assert response.status_code == 204
+    assert client.get("/favorites", headers=_bearer(access)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": refresh}).status_code == 401
+    row = (
+        catalog.db.query(RevokedToken)
+        .filter(RevokedToken.kind == REVOKED_ACCESS, RevokedToken.user_id == user.id)
+        .one()
+    )
+    assert int(row.expires_at.timestamp()) == _claims(access)["exp"]
+
+
+def test_logout_cannot_be_replayed(client, catalog):
+    user = catalog.user("buyer")
+    refresh = create_refresh_token(user_id=user.id)
+    assert client.post("/auth/logout", json={"refresh_token": refresh}).status_code == 204
+    before = _revocations(catalog, user)
+
+    for _ in range(3):
+        access = create_access_token(user_id=user.id, username=user.username)
+        response = client.post(
+            "/auth/logout", json={"refresh_token": refresh}, headers=_bearer(access)
+        )
+        assert response.status_code == 401
+    assert _revocations(catalog, user) == before
+
+
+def test_logout_rejects_bearer_tokens_it_cannot_vouch_for(client, catalog):
+    user, other = catalog.user("buyer"), catalog.user("other")
+    refresh = create_refresh_token(user_id=user.id)
+    foreign = create_access_token(user_id=other.id, username=other.username)
+    bearers = [
+        foreign,
+        create_refresh_token(user_id=user.id),  # not an access token
+        jwt.encode({"sub": str(user.id), "type": "access"}, "wrong-secret", algorithm=JWT_ALG),
+        "not-a-jwt",
+    ]
+
+    for bearer in bearers:
+        response = client.post(
+            "/auth/logout", json={"refresh_token": refresh}, headers=_bearer(bearer)
+        )
+        assert response.status_code == 401, bearer
+    assert _revocations(catalog, user) == set()
+    assert client.get("/favorites", headers=_bearer(foreign)).status_code == 200
+
+
+def test_refresh_tokens_are_not_access_tokens(client, catalog):
+    user = catalog.user("buyer")
+    refresh = create_refresh_token(user_id=user.id)
+
+    assert client.get("/favorites", headers=_bearer(refresh)).status_code == 401
+    access = create_access_token(user_id=user.id, username=user.username)
+    assert client.post("/auth/refresh", json={"refresh_token": access}).status_code == 401
+
+
+def test_every_revoking_commit_moves_the_snapshot_version(client, catalog):
+    user = catalog.user("buyer")
+    tokens = [
+        create_access_token(user_id=user.id, username=user.username, expires_minutes=minutes)
+        for minutes in (5, 6)
+    ]
+    for token in tokens:
+        assert client.get("/favorites", headers=_bearer(token)).status_code == 200
+
+    # two workers revoke; neither refreshes this worker's snapshot
+    expires = datetime.fromtimestamp(time.time() + 600, timezone.utc)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        revoke_tokens(first, REVOKED_ACCESS, user.id, expires, token_digest(tokens[0]))
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # waits on the version row until the first transaction is done
+            def revoke_second():
+                revoke_tokens(second, REVOKED_ACCESS, user.id, expires, token_digest(tokens[1]))
+                second.commit()
+
+            later = pool.submit(revoke_second)
+            time.sleep(0.2)
+            assert not later.done()
+            first.commit()
+            later.result()
+    finally:
+        first.close()
+        second.close()
+
+    revoked_tokens.refresh()  # what the periodic check does
+    for token in tokens:
+        assert client.get("/favorites", headers=_bearer(token)).status_code == 401
+
+
+def test_an_unbuilt_snapshot_is_reported(caplog, monkeypatch):
+    def unreachable():
+        raise OSError("database is down")
+
+    monkeypatch.setattr(revoked_tokens, "_state", None)
+    monkeypatch.setattr(revoked_tokens, "_build", unreachable)
+    monkeypatch.setattr(security, "_unbuilt_warned_at", None)
+
+    security.warm_revoked_tokens()  # startup: logs, does not raise
+    assert "Could not build the token revocation snapshot" in caplog.text
+
+    assert security._revoked_digests() == frozenset()
+    assert "revoked access tokens are accepted" in caplog.text
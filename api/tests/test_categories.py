@@ -0,0 +1,100 @@
+# api/tests/test_categories.py — closure-table reads and the cached tree
+from api.models.category import CategoryTreeVersion
+from api.routers.categories import _tree_snapshot
+
+from .conftest import count_queries
+
+
+def test_ancestors_run_root_first(client, catalog):
+    jewelry = catalog.category("Jewelry")
+    rings = catalog.category("Rings", parent=jewelry)
+    silver = catalog.category("Silver", parent=rings)
+
+    response = client.get(f"/categories/{silver.id}/ancestors")
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()] == ["Jewelry", "Rings", "Silver"]
+    assert [c["name"] for c in client.get(f"/categories/{jewelry.id}/ancestors").json()] == [
+        "Jewelry"
+    ]
+
+
+def test_ancestors_of_unknown_category(client, database):
+    assert client.get("/categories/0/ancestors").status_code == 404
+
+
+def test_include_descendants_filters_by_subtree(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    jewelry = catalog.category("Jewelry")
+    rings = catalog.category("Rings", parent=jewelry)
+    silver = catalog.category("Silver", parent=rings)
+    home = catalog.category("Home")
+    ids = {
+        category.name: {p.id for p in catalog.products(seller, category, 2)}
+        for category in (jewelry, rings, silver, home)
+    }
+
+    def listed(category, **params):
+        response = client.get(
+            "/products", params={"category_id": category.id, "limit": 100, **params}
+        )
+        return {p["id"] for p in response.json()}
+
+    assert listed(rings) == ids["Rings"]
+    assert listed(rings, include_descendants=True) == ids["Rings"] | ids["Silver"]
+    assert listed(jewelry, include_descendants=True) == (
+        ids["Jewelry"] | ids["Rings"] | ids["Silver"]
+    )
+    assert listed(home, include_descendants=True) == ids["Home"]
+
+
+def _bump_tree_version(catalog):
+    # what the Django signals do on every Category write
+    catalog.db.query(CategoryTreeVersion).filter(CategoryTreeVersion.id == 1).update(
+        {CategoryTreeVersion.version: CategoryTreeVersion.version + 1}
+    )
+    catalog.db.commit()
+
+
+def _names(nodes):
+    for node in nodes:
+        yield node["name"]
+        yield from _names(node["children"])
+
+
+def test_tree_is_served_from_the_snapshot_with_an_etag(client, catalog):
+    catalog.category("Rings", parent=catalog.category("Jewelry"))
+    _bump_tree_version(catalog)
+    _tree_snapshot.refresh()
+
+    with count_queries() as statements:
+        response = client.get("/categories/tree")
+    assert statements == []
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    jewelry = next(n for n in response.json() if n["slug"] == f"{catalog.prefix}-jewelry")
+    assert [c["name"] for c in jewelry["children"]] == ["Rings"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/categories/tree", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+    assert client.get("/categories/tree", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_tree_etag_changes_with_the_version(client, catalog):
+    _tree_snapshot.refresh()
+    etag = client.get("/categories/tree").headers["etag"]
+
+    catalog.category("Brooches")
+    _tree_snapshot.refresh()
+    # the version row did not move: still the old snapshot
+    assert client.get("/categories/tree").headers["etag"] == etag
+
+    _bump_tree_version(catalog)
+    _tree_snapshot.refresh()
+    response = client.get("/categories/tree", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "Brooches" in set(_names(response.json()))
@@ -0,0 +1,103 @@
+# api/tests/test_media_resize.py — on-demand resized product images
+import io
+
+import pytest
+from PIL import Image
+
+from api.common.cache import DiskLRUCache
+from api.routers import media
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIA_ROOT", str(tmp_path))
+    monkeypatch.setattr(media, "MEDIA_ROOT", tmp_path.resolve())
+    monkeypatch.setattr(
+        media, "_resize_cache", DiskLRUCache(tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def image(client, catalog, media_root):
+    seller = catalog.user("seller", seller=True)
+    (product,) = catalog.products(seller, catalog.category("Rings"), 1)
+    out = io.BytesIO()
+    Image.new("RGB", (800, 600), "red").save(out, "JPEG")
+    headers = catalog.headers(seller)
+    response = client.post(
+        f"/seller/products/{product.id}/images",
+        files={"file": ("photo.jpg", out.getvalue(), "image/jpeg")},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    return {**response.json(), "headers": headers}
+
+
+def _cached(media_root):
+    return [p for p in (media_root / "cache").rglob("*") if p.is_file()]
+
+
+def test_resize_renders_once_then_serves_the_cached_copy(client, image, media_root):
+    url = f"/media/resize/320/{image['image']}"
+
+    response = client.get(url, headers={"Accept": "image/webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert Image.open(io.BytesIO(response.content)).size == (320, 240)
+    assert len(_cached(media_root)) == 1
+
+    again = client.get(url, headers={"Accept": "image/webp"})
+    assert again.content == response.content
+    assert len(_cached(media_root)) == 1
+
+    jpeg = client.get(url, headers={"Accept": "image/*"})
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    assert jpeg.headers["etag"] != response.headers["etag"]
+
+    revalidated = client.get(
+        url, headers={"Accept": "image/webp", "If-None-Match": response.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+
+def test_resize_rejects_unknown_widths_and_files(client, image, media_root):
+    assert client.get(f"/media/resize/333/{image['image']}").status_code == 400
+    (media_root / "products" / "stray.jpg").write_bytes(b"not an image row")
+    assert client.get("/media/resize/320/products/stray.jpg").status_code == 404
+    assert client.get("/media/resize/320/../../etc/passwd").status_code == 404
+
+
+def test_deleted_images_stop_being_served_from_the_cache(client, catalog, image, media_root):
+    url = f"/media/resize/320/{image['image']}"
+    assert client.get(url).status_code == 200
+    etag = client.get(url).headers["etag"]
+
+    client.delete(
+        f"/seller/products/{image['product_id']}/images/{image['id']}",
+        headers=image["headers"],
+    )
+
+    assert _cached(media_root)  # still on disk until evicted
+    assert client.get(url).status_code == 404
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 404
+
+
+def test_copy_evicted_before_the_response_is_rendered_again(
+    client, image, media_root, monkeypatch
+):
+    url = f"/media/resize/320/{image['image']}"
+    assert client.get(url).status_code == 200
+    lookup = media._resize_cache.get
+
+    async def get_then_evict(key, suffix=""):
+        # another worker evicts the file right after our lookup
+        path = await lookup(key, suffix)
+        if path is not None:
+            path.unlink()
+        return path
+
+    monkeypatch.setattr(media._resize_cache, "get", get_then_evict)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert Image.open(io.BytesIO(response.content)).size == (320, 240)
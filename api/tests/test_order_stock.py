@@ -0,0 +1,93 @@
+# api/tests/test_order_stock.py — stock reservation under concurrency
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from api.models.order import Order, OrderItem
+from api.models.product import Product
+
+PARALLEL_ORDERS = 300
+STOCK = 50
+P99_BUDGET_SECONDS = 2.0
+
+
+def _stock(catalog, product_id: int) -> int:
+    catalog.db.expire_all()
+    return catalog.db.get(Product, product_id).stock_quantity
+
+
+def test_parallel_orders_never_oversell(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    (product,) = catalog.products(seller, catalog.category("Rings"), 1, stock=STOCK)
+    headers = catalog.headers(catalog.user("buyer"))
+
+    def place(_):
+        started = time.perf_counter()
+        response = client.post(
+            "/orders", json={"product_id": product.id, "quantity": 1}, headers=headers
+        )
+        return response.status_code, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(place, range(PARALLEL_ORDERS)))
+
+    statuses = [code for code, _ in results]
+    assert statuses.count(201) == STOCK
+    assert statuses.count(409) == PARALLEL_ORDERS - STOCK
+    assert _stock(catalog, product.id) == 0
+    sold = (
+        catalog.db.query(OrderItem)
+        .filter(OrderItem.product_id == product.id)
+        .with_entities(OrderItem.quantity)
+        .all()
+    )
+    assert sum(q for (q,) in sold) == STOCK
+
+    latencies = sorted(took for _, took in results)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    assert p99 < P99_BUDGET_SECONDS, f"p99 {p99:.3f}s"
+
+
+def test_orders_refresh_cached_product_detail(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    first, second = catalog.products(seller, catalog.category("Rings"), 2, stock=5)
+    headers = catalog.headers(catalog.user("buyer"))
+
+    def detail_stock(product_id):
+        return client.get(f"/products/{product_id}").json()["stock_quantity"]
+
+    assert detail_stock(first.id) == 5  # now cached
+    order = client.post(
+        "/orders", json={"product_id": first.id, "quantity": 2}, headers=headers
+    ).json()
+    assert detail_stock(first.id) == 3
+
+    assert detail_stock(second.id) == 5
+    client.post(
+        "/orders/checkout",
+        json={"items": [{"product_id": second.id, "quantity": 4}]},
+        headers=headers,
+    )
+    assert detail_stock(second.id) == 1
+
+    client.post(f"/orders/{order['id']}/cancel", headers=headers)
+    assert detail_stock(first.id) == 5
+
+
+def test_cancel_restocks_only_reserved_orders(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    (product,) = catalog.products(seller, catalog.category("Rings"), 1, stock=5)
+    buyer = catalog.user("buyer")
+
+    # placed before reservations existed: stock was never taken
+    legacy = Order(buyer_id=buyer.id, status="pending", shipping_snapshot={})
+    catalog.db.add(legacy)
+    catalog.db.flush()
+    catalog.db.add(OrderItem(
+        order_id=legacy.id, product_id=product.id, quantity=3, unit_price=Decimal("10")
+    ))
+    catalog.db.commit()
+
+    response = client.post(f"/orders/{legacy.id}/cancel", headers=catalog.headers(buyer))
+    assert response.status_code == 200
+    assert _stock(catalog, product.id) == 5
@@ -0,0 +1,65 @@
+# api/tests/test_product_detail.py — one-query product detail and its cache
+from .conftest import count_queries
+
+
+def test_detail_is_one_query_then_served_from_cache(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    warm, product = catalog.products(seller, catalog.category("Rings"), 2, images=2)
+    headers = catalog.headers(catalog.user("buyer"))
+    client.get(f"/products/{warm.id}", headers=headers)  # warm auth caches
+    url = f"/products/{product.id}"  # read ids outside the counted blocks
+
+    with count_queries() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    detail = response.json()
+    assert len(statements) == 1
+    assert detail["shop_name"].endswith("-shop")
+    assert detail["category_name"] == "Rings"
+    assert [img["position"] for img in detail["images"]] == [0, 1]
+
+    with count_queries() as statements:
+        assert client.get(url).json() == detail
+    assert statements == []
+
+    # only the favorite flag is looked up per user
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    assert len(statements) == 1
+    assert response.json()["is_favorited"] is False
+
+
+def test_seller_writes_invalidate_cached_detail(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    category = catalog.category("Rings")
+    (product,) = catalog.products(seller, category, 1, stock=5)
+    headers = catalog.headers(seller)
+    url = f"/products/{product.id}"
+
+    assert client.get(url).json()["title"] == "Silver ring 0"  # now cached
+
+    client.patch(f"/seller/products/{product.id}", json={"title": "Gold ring"}, headers=headers)
+    assert client.get(url).json()["title"] == "Gold ring"
+
+    client.patch(
+        f"/seller/products/{product.id}/stock", json={"stock_quantity": 2}, headers=headers
+    )
+    assert client.get(url).json()["stock_quantity"] == 2
+
+    client.put(
+        f"/seller/products/{product.id}",
+        json={"title": "Bronze ring", "price": 7, "category_id": category.id, "status": "active"},
+        headers=headers,
+    )
+    detail = client.get(url).json()
+    assert (detail["title"], float(detail["price"])) == ("Bronze ring", 7.0)
+
+    client.patch(
+        "/seller/products/bulk",
+        json={"items": [{"id": product.id, "stock_quantity": 9}]},
+        headers=headers,
+    )
+    assert client.get(url).json()["stock_quantity"] == 9
+
+    client.patch(f"/seller/products/{product.id}", json={"status": "paused"}, headers=headers)
+    assert client.get(url).status_code == 404
@@ -0,0 +1,123 @@
+# api/tests/test_product_images.py — image uploads, variants and shared media
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+from sqlalchemy import text
+
+from api.models.product_image import ProductImage
+from backend.apps.catalog.images import variants_exist
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIA_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def _png(size=(64, 48), color="red", mode="RGB") -> bytes:
+    out = io.BytesIO()
+    Image.new(mode, size, color).save(out, "PNG")
+    return out.getvalue()
+
+
+def _upload(client, catalog, product, body: bytes, headers):
+    return client.post(
+        f"/seller/products/{product.id}/images",
+        files={"file": ("photo.png", body, "image/png")},
+        headers=headers,
+    )
+
+
+def _files(media_root):
+    return sorted(
+        p.relative_to(media_root).as_posix()
+        for p in (media_root / "products").rglob("*")
+        if p.is_file()
+    )
+
+
+def _image_count(catalog, product) -> int:
+    return catalog.db.query(ProductImage).filter(ProductImage.product_id == product.id).count()
+
+
+@pytest.mark.parametrize(
+    "body, status",
+    [
+        (_png()[:40] + b"\0" * 200, 400),  # PNG magic bytes, nothing decodable
+        # 400 megapixels, a few KB compressed: over Pillow's bomb limit
+        (_png(size=(20_000, 20_000), color=0, mode="1"), 413),
+    ],
+    ids=["corrupt", "decompression-bomb"],
+)
+def test_undecodable_uploads_are_rejected_and_leave_nothing(
+    client, catalog, media_root, body, status
+):
+    seller = catalog.user("seller", seller=True)
+    (product,) = catalog.products(seller, catalog.category("Rings"), 1)
+
+    response = _upload(client, catalog, product, body, catalog.headers(seller))
+
+    assert response.status_code == status
+    assert _files(media_root) == []
+    assert _image_count(catalog, product) == 0
+
+
+def _refcount(catalog, path):
+    catalog.db.rollback()  # see other sessions' commits
+    return catalog.db.execute(
+        text("SELECT refcount FROM catalog_mediablob WHERE path = :path"), {"path": path}
+    ).scalar()
+
+
+def test_identical_uploads_share_one_counted_file(client, catalog, media_root):
+    seller = catalog.user("seller", seller=True)
+    first, second = catalog.products(seller, catalog.category("Rings"), 2)
+    headers = catalog.headers(seller)
+    body = _png()
+
+    a = _upload(client, catalog, first, body, headers).json()
+    b = _upload(client, catalog, second, body, headers).json()
+    c = _upload(client, catalog, second, body, headers).json()
+
+    assert a["image"] == b["image"] == c["image"]
+    assert a["image"].startswith("products/") and a["variants"] == b["variants"]
+    assert len(_files(media_root)) == 1 + 6  # original + 3 sizes x 2 formats
+    assert _refcount(catalog, a["image"]) == 3
+
+    client.delete(f"/seller/products/{second.id}/images/{b['id']}", headers=headers)
+    client.delete(f"/seller/products/{second.id}/images/{c['id']}", headers=headers)
+    assert _refcount(catalog, a["image"]) == 1
+    assert len(_files(media_root)) == 7
+    assert [img["id"] for img in client.get(f"/products/{first.id}").json()["images"]] == [
+        a["id"]
+    ]
+
+    response = client.delete(f"/seller/products/{first.id}/images/{a['id']}", headers=headers)
+    assert response.status_code == 204
+    assert _refcount(catalog, a["image"]) is None
+    assert _files(media_root) == []
+    assert client.get(f"/products/{first.id}").json()["images"] == []
+
+
+def test_upload_racing_the_last_release_keeps_its_file(client, catalog, media_root):
+    seller = catalog.user("seller", seller=True)
+    old, new = catalog.products(seller, catalog.category("Rings"), 2)
+    headers = catalog.headers(seller)
+
+    for round_ in range(10):
+        body = _png(color=(round_, 0, 0))
+        image = _upload(client, catalog, old, body, headers).json()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            deleted = pool.submit(
+                client.delete, f"/seller/products/{old.id}/images/{image['id']}", headers=headers
+            )
+            uploaded = pool.submit(_upload, client, catalog, new, body, headers)
+        assert deleted.result().status_code == 204
+        assert uploaded.result().status_code == 201
+
+        # whichever ran first, the surviving row has its file and one reference
+        assert _refcount(catalog, image["image"]) == 1
+        assert (media_root / image["image"]).is_file()
+        assert variants_exist(str(media_root), image["variants"])
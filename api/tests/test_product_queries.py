@@ -0,0 +1,42 @@
+# api/tests/test_product_queries.py — product card pages must not N+1
+from .conftest import count_queries
+
+
+def test_public_listing_query_count_is_flat(client, catalog):
+    category = catalog.category("Rings")
+    for name in ("a", "b", "c"):
+        catalog.products(catalog.user(name, seller=True), category, 8, images=2)
+
+    client.get(f"/products?category_id={category.id}&limit=1")  # warm lookups
+
+    counts = {}
+    for limit in (3, 24):
+        with count_queries() as statements:
+            response = client.get(f"/products?category_id={category.id}&limit={limit}")
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+
+    # category/seller/profile joined into the page query, images in one IN query
+    assert counts == {3: 2, 24: 2}
+    card = response.json()[0]
+    assert card["shop_name"].endswith("-shop")
+    assert card["category_name"] == "Rings"
+    assert len(card["images"]) == 2
+
+
+def test_seller_listing_query_count_is_flat(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    catalog.products(seller, catalog.category("Rings"), 20, images=2)
+    headers = catalog.headers(seller)
+    client.get("/seller/products?limit=1", headers=headers)  # warm auth caches
+
+    counts = {}
+    for limit in (2, 20):
+        with count_queries() as statements:
+            response = client.get(f"/seller/products?limit={limit}", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+
+    assert counts == {2: 2, 20: 2}
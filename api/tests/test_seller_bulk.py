@@ -0,0 +1,85 @@
+# api/tests/test_seller_bulk.py — bulk price/stock/status updates
+from decimal import Decimal
+
+from api.models.product import Product
+
+from .conftest import count_queries
+
+
+def _state(catalog, *products):
+    catalog.db.expire_all()
+    return [
+        (p.price, p.stock_quantity, p.status)
+        for p in (catalog.db.get(Product, product.id) for product in products)
+    ]
+
+
+def test_bulk_update_sets_only_the_given_fields(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    first, second, untouched = catalog.products(seller, catalog.category("Rings"), 3, stock=5)
+
+    response = client.patch(
+        "/seller/products/bulk",
+        json={"items": [
+            {"id": second.id, "stock_quantity": 0, "status": "paused"},
+            {"id": first.id, "price": "99.90"},
+        ]},
+        headers=catalog.headers(seller),
+    )
+    assert response.status_code == 200
+    assert response.json() == {"updated": sorted([first.id, second.id])}
+    assert _state(catalog, first, second, untouched) == [
+        (Decimal("99.90"), 5, "active"),
+        (Decimal("11.00"), 0, "paused"),
+        (Decimal("12.00"), 5, "active"),
+    ]
+
+
+def test_bulk_update_skips_other_sellers_products(client, catalog):
+    category = catalog.category("Rings")
+    seller = catalog.user("seller", seller=True)
+    (own,) = catalog.products(seller, category, 1)
+    (foreign,) = catalog.products(catalog.user("other", seller=True), category, 1)
+
+    response = client.patch(
+        "/seller/products/bulk",
+        json={"items": [
+            {"id": own.id, "stock_quantity": 1},
+            {"id": foreign.id, "stock_quantity": 1},
+        ]},
+        headers=catalog.headers(seller),
+    )
+    assert response.json() == {"updated": [own.id]}
+    assert _state(catalog, foreign)[0][1] == 5
+
+
+def test_bulk_update_rejects_bad_batches(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    (product,) = catalog.products(seller, catalog.category("Rings"), 1)
+    headers = catalog.headers(seller)
+
+    def patch(items):
+        return client.patch("/seller/products/bulk", json={"items": items}, headers=headers)
+
+    assert patch([{"id": product.id}, {"id": product.id, "price": 1}]).status_code == 400
+    assert patch([{"id": product.id, "status": "sold"}]).status_code == 400
+    assert patch([{"id": product.id, "stock_quantity": -1}]).status_code == 422
+    assert patch([]).status_code == 422
+    assert _state(catalog, product) == [(Decimal("10.00"), 5, "active")]
+
+
+def test_bulk_update_is_one_statement_however_many_items(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    products = catalog.products(seller, catalog.category("Rings"), 60)
+    headers = catalog.headers(seller)
+    ids = [p.id for p in products]
+    client.patch("/seller/products/bulk", json={"items": [{"id": ids[0]}]}, headers=headers)
+
+    counts = {}
+    for size in (2, 60):
+        items = [{"id": pid, "stock_quantity": size} for pid in ids[:size]]
+        with count_queries() as statements:
+            response = client.patch("/seller/products/bulk", json={"items": items}, headers=headers)
+        assert len(response.json()["updated"]) == size
+        counts[size] = len(statements)
+    assert counts == {2: 1, 60: 1}
@@ -0,0 +1,115 @@
+# api/tests/test_seller_import.py — bulk product import
+import json
+
+from api.models.product import Product
+
+from .conftest import count_queries
+
+
+def _import(client, headers, name, body, **data):
+    return client.post(
+        "/seller/products/import",
+        files={"file": (name, body.encode())},
+        data=data,
+        headers=headers,
+    )
+
+
+def _imported(catalog, seller):
+    catalog.db.expire_all()
+    return (
+        catalog.db.query(Product)
+        .filter(Product.seller_id == seller.id)
+        .order_by(Product.id)
+        .all()
+    )
+
+
+def test_csv_import_creates_valid_rows_and_reports_the_rest(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    category = catalog.category("Rings")
+    title = f"{catalog.prefix} Silver Ring"
+    csv_body = "\n".join([
+        "title,price,stock_quantity,category_id,status,description",
+        f"{title},12.50,3,{category.id},active,handmade",
+        f"{title},13,,{category.id},,",
+        f"{title},-1,1,,active,",
+        f"Other,5,1,999999999,active,",
+        f"Other,5,1,,sold,",
+        f"{catalog.prefix} Bracelet,20,1,,draft,",
+    ])
+
+    response = _import(client, catalog.headers(seller), "products.csv", csv_body)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["created"], result["failed"]) == (3, 3)
+    errors = {e["row"]: e["errors"] for e in result["errors"]}
+    assert list(errors) == [3, 4, 5]
+    assert errors[3][0].startswith("price:")
+    assert errors[4] == ["category_id: unknown category"]
+    assert errors[5][0].startswith("status:")
+
+    products = _imported(catalog, seller)
+    assert [(p.title, p.stock_quantity, p.status) for p in products] == [
+        (title, 3, "active"),
+        (title, 0, "draft"),  # empty cells take the schema defaults
+        (f"{catalog.prefix} Bracelet", 1, "draft"),
+    ]
+    assert len({p.slug for p in products}) == 3
+    assert products[0].slug == f"{catalog.prefix}-silver-ring"
+    assert products[1].slug == f"{catalog.prefix}-silver-ring-2"
+
+
+def test_ndjson_import_reports_unparseable_lines(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    lines = [
+        json.dumps({"title": f"{catalog.prefix} Ring", "price": 9}),
+        "",
+        "{not json",
+        "[1, 2]",
+        json.dumps({"title": f"{catalog.prefix} Ring", "price": 10, "status": "active"}),
+    ]
+
+    response = _import(client, catalog.headers(seller), "products.ndjson", "\n".join(lines))
+    result = response.json()
+    assert (result["created"], result["failed"]) == (2, 2)
+    assert [e["row"] for e in result["errors"]] == [3, 4]
+    assert result["errors"][1]["errors"] == ["expected a JSON object"]
+    assert len({p.slug for p in _imported(catalog, seller)}) == 2
+
+
+def test_reimport_allocates_fresh_slugs(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    headers = catalog.headers(seller)
+    body = "title,price\n" + f"{catalog.prefix} Ring,5\n" * 3
+
+    for _ in range(2):
+        assert _import(client, headers, "products.csv", body).json()["created"] == 3
+
+    slugs = [p.slug for p in _imported(catalog, seller)]
+    base = f"{catalog.prefix}-ring"
+    assert slugs == [base] + [f"{base}-{n}" for n in range(2, 7)]
+
+
+def test_import_query_count_does_not_grow_with_rows(client, catalog):
+    seller = catalog.user("seller", seller=True)
+    headers = catalog.headers(seller)
+    category = catalog.category("Rings")
+    _import(client, headers, "warm.csv", "title,price\n")  # warm auth caches
+
+    counts = {}
+    for rows in (5, 200):
+        body = "title,price,category_id\n" + "".join(
+            f"{catalog.prefix} Ring {rows}-{n},5,{category.id}\n" for n in range(rows)
+        )
+        with count_queries() as statements:
+            assert _import(client, headers, "products.csv", body).json()["created"] == rows
+        counts[rows] = len(statements)
+    assert counts[5] == counts[200]
+
+
+def test_import_needs_a_known_format(client, catalog):
+    headers = catalog.headers(catalog.user("seller", seller=True))
+    assert _import(client, headers, "products.xlsx", "x").status_code == 400
+    response = _import(client, headers, "upload", "title,price\nRing,5\n", format="csv")
+    assert response.json()["created"] == 1
@@ -14,9 +14,9 @@ class ProductImageInline(admin.TabularInline):
     def preview(self, obj):  # pragma: no cover
         if obj and getattr(obj, "image", None):
             try:
-                return format_html(
-                    '<img src="{}" style="height:60px;" />', obj.image.url
-                )
+                thumb = (obj.variants or {}).get("thumb", {}).get("webp")
+                url = obj.image.storage.url(thumb) if thumb else obj.image.url
+                return format_html('<img src="{}" style="height:60px;" />', url)
             except Exception:
                 return "—"
         return "—"
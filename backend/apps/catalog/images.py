@@ -0,0 +1,138 @@
+"""
+Resized derivatives of product images, shared by the FastAPI upload endpoint
+and the ``backfill_image_variants`` management command.
+
+Every original gets one file per size in ``VARIANT_SIZES``, each as WebP plus
+a JPEG fallback, written next to it as ``<stem>-<size>.<ext>``. Originals
+are content-named (see catalog.media), so identical uploads share their
+variants too. The relative paths are stored on
+``catalog_productimage.variants``::
+
+    {"thumb": {"webp": "products/ab/cd/abcd...-thumb.webp", "jpeg": "...-thumb.jpg"}, ...}
+
+Decoding and resizing are CPU-bound and hold the GIL, so they run in a
+process pool; ``make_variants`` only takes and returns plain strings/dicts so
+it can be shipped to a worker.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+# name -> bounding box edge in pixels (never upscaled)
+VARIANT_SIZES = {"thumb": 200, "card": 480, "full": 1600}
+VARIANT_FORMATS = {
+    "webp": (".webp", "WEBP", {"quality": 80, "method": 4}),
+    "jpeg": (".jpg", "JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def variant_pool() -> ProcessPoolExecutor:
+    """Process pool for ``make_variants``, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _pool
+
+
+def variants_for(rel_path: str) -> dict:
+    """The ``variants`` mapping for an original, whether rendered yet or not."""
+    stem, _ = os.path.splitext(rel_path)
+    return {
+        name: {fmt_name: f"{stem}-{name}{ext}" for fmt_name, (ext, _, _) in VARIANT_FORMATS.items()}
+        for name in VARIANT_SIZES
+    }
+
+
+def variants_exist(media_root: str, variants: dict) -> bool:
+    return all(os.path.exists(os.path.join(media_root, p)) for p in variant_paths(variants))
+
+
+def variant_paths(variants: dict | None) -> list[str]:
+    """Every relative path referenced by a ``variants`` mapping."""
+    return [path for formats in (variants or {}).values() for path in formats.values()]
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """RGB version for JPEG; transparency goes onto white."""
+    if img.mode != "RGBA":
+        return img.convert("RGB")
+    background = Image.new("RGB", img.size, "white")
+    background.paste(img, mask=img.getchannel("A"))
+    return background
+
+
+def _save_atomic(img: Image.Image, target: Path, fmt: str, options: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".variant-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            img.save(out, fmt, **options)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def make_variants(media_root: str, rel_path: str) -> dict:
+    """
+    Write all derivatives of ``media_root/rel_path`` and return the
+    ``variants`` mapping. Raises ``PIL.UnidentifiedImageError`` / ``OSError``
+    for files Pillow cannot decode and ``PIL.Image.DecompressionBombError``
+    for ones over ``Image.MAX_IMAGE_PIXELS``. On failure none of the
+    derivatives written so far are left behind.
+    """
+    root = Path(media_root)
+    source = root / rel_path
+    with Image.open(source) as img:
+        # JPEG only: let libjpeg decode at a reduced scale when the largest
+        # variant is much smaller than the original
+        img.draft("RGB", (max(VARIANT_SIZES.values()),) * 2)
+        img = ImageOps.exif_transpose(img)
+        base = img.convert("RGBA" if _has_alpha(img) else "RGB")
+
+    variants = variants_for(rel_path)
+    written = []
+    try:
+        for name, edge in VARIANT_SIZES.items():
+            resized = base.copy()
+            resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            for fmt_name, (_, fmt, options) in VARIANT_FORMATS.items():
+                target = root / variants[name][fmt_name]
+                _save_atomic(resized if fmt == "WEBP" else _flatten(resized), target, fmt, options)
+                written.append(target)
+    except BaseException:
+        # a partial set would pass for rendered once the rest appears
+        for target in written:
+            target.unlink(missing_ok=True)
+        raise
+    return variants
+
+
+def render_width(source: str, target: str, width: int, fmt_name: str) -> None:
+    """
+    Write ``source`` scaled to ``width`` pixels wide (never upscaled) as
+    ``fmt_name`` ("webp"/"jpeg") to ``target``; for the on-demand resize
+    endpoint, run in ``variant_pool()``.
+    """
+    _, fmt, options = VARIANT_FORMATS[fmt_name]
+    with Image.open(source) as img:
+        img.draft("RGB", (width, width))
+        img = ImageOps.exif_transpose(img)
+        base = img.convert("RGBA" if _has_alpha(img) else "RGB")
+    if base.width > width:
+        height = max(1, round(base.height * width / base.width))
+        base = base.resize((width, height), Image.Resampling.LANCZOS)
+    _save_atomic(base if fmt == "WEBP" else _flatten(base), Path(target), fmt, options)
+
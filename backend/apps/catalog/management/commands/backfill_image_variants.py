@@ -0,0 +1,55 @@
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from backend.apps.catalog.images import make_variants, variant_pool
+from backend.apps.catalog.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = "Render thumb/card/full WebP+JPEG variants for images that have none."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=200,
+            help="Images submitted to the process pool per round (default: 200).",
+        )
+        parser.add_argument(
+            "--all", action="store_true", dest="rerender",
+            help="Re-render images that already have variants too.",
+        )
+
+    def handle(self, *args, batch_size, rerender, **options):
+        media_root = str(settings.MEDIA_ROOT)
+        pool = variant_pool()
+        queryset = ProductImage.objects.order_by("id").only("id", "image")
+        if not rerender:
+            queryset = queryset.filter(variants={})
+
+        done = failed = 0
+        last_id = 0
+        while True:
+            # keyset batches: rows drop out of the filter as they are filled
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            futures = {
+                pool.submit(make_variants, media_root, img.image.name): img
+                for img in batch
+            }
+            for future in as_completed(futures):
+                img = futures[future]
+                try:
+                    variants = future.result()
+                except (OSError, Image.DecompressionBombError) as exc:
+                    failed += 1
+                    self.stderr.write(f"#{img.id} {img.image.name}: {exc}")
+                    continue
+                ProductImage.objects.filter(pk=img.pk).update(variants=variants)
+                done += 1
+            self.stdout.write(f"... {done} done, {failed} failed")
+
+        self.stdout.write(self.style.SUCCESS(f"Variants written for {done} images, {failed} failed"))
@@ -0,0 +1,158 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from backend.apps.catalog.images import VARIANT_SIZES
+from backend.apps.catalog.media import CLAIM_SQL, FORGET_MANY_SQL, MEDIA_PREFIX
+
+# extensions an original may have been stored with (legacy uploads included)
+ORIGINAL_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+VARIANT_SUFFIXES = tuple(f"-{name}" for name in VARIANT_SIZES)
+
+
+def scan_files(directory):
+    """Yield ``DirEntry`` for every file below ``directory``, one level at a time."""
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def owner_candidates(rel):
+    """
+    ``catalog_productimage.image`` values that would keep ``rel`` alive: the
+    file itself, and if it is named like a ``<stem>-<size>.<ext>`` variant,
+    that original too. Legacy uploads kept their own names, so a file called
+    ``gift-card.jpg`` may just as well be an original.
+    """
+    stem, _ = os.path.splitext(rel)
+    candidates = {rel}
+    for suffix in VARIANT_SUFFIXES:
+        if stem.endswith(suffix):
+            original = stem[: -len(suffix)]
+            candidates.update(original + ext for ext in ORIGINAL_EXTS)
+            break
+    return candidates
+
+
+class Command(BaseCommand):
+    help = (
+        "Find media files under MEDIA_ROOT/products that no product image "
+        "references and report, quarantine or delete them."
+    )
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument("--delete", action="store_true", help="Unlink orphans.")
+        action.add_argument(
+            "--quarantine", metavar="DIR",
+            help="Move orphans into DIR (keeping their relative path) instead of deleting.",
+        )
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Leave files modified more recently than this alone (default: 24).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Files checked against the database per query (default: 1000).",
+        )
+
+    def handle(self, *args, delete, quarantine, grace_hours, batch_size, **options):
+        self.media_root = Path(settings.MEDIA_ROOT)
+        self.quarantine = Path(quarantine) if quarantine else None
+        self.apply = delete or self.quarantine is not None
+        self.cutoff = time.time() - grace_hours * 3600
+        self.scanned = self.orphans = self.reclaimed = self.stale = 0
+
+        batch = []
+        for entry in scan_files(self.media_root / MEDIA_PREFIX):
+            self.scanned += 1
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                self.collect(batch)
+                batch = []
+        if batch:
+            self.collect(batch)
+
+        verb = "reclaimed" if self.apply else "reclaimable (dry run)"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {self.scanned} files: {self.orphans} orphans, "
+            f"{self.reclaimed} bytes ({self.reclaimed / 1024 / 1024:.1f} MB) {verb}"
+        ))
+        if self.stale:
+            self.stdout.write(self.style.WARNING(
+                f"{self.stale} unreferenced files kept: catalog_mediablob still counts them"
+            ))
+
+    def collect(self, entries):
+        files = {}
+        for entry in entries:
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue  # removed since the scan listed it
+            if stat.st_mtime >= self.cutoff:
+                continue
+            rel = Path(entry.path).relative_to(self.media_root).as_posix()
+            files[rel] = (owner_candidates(rel), stat.st_size)
+        if not files:
+            return
+
+        candidates = set().union(*(owners for owners, _ in files.values()))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT image FROM catalog_productimage WHERE image = ANY(%(paths)s)",
+                {"paths": sorted(candidates)},
+            )
+            live = {row[0] for row in cursor.fetchall()}
+        orphans = {rel: v for rel, v in files.items() if not v[0] & live}
+        if not orphans:
+            return
+        claimed = sorted(set().union(*(owners for owners, _ in orphans.values())))
+        with transaction.atomic(), connection.cursor() as cursor:
+            if self.apply:
+                # same row locks as an upload/release of these files (media.py)
+                cursor.execute(CLAIM_SQL, {"paths": claimed})
+            else:
+                cursor.execute(
+                    "SELECT path, refcount FROM catalog_mediablob WHERE path = ANY(%(paths)s)",
+                    {"paths": claimed},
+                )
+            counted = {path for path, refcount in cursor.fetchall() if refcount > 0}
+            for rel, (owners, size) in orphans.items():
+                if owners & counted:
+                    self.stale += 1
+                    continue
+                if not self.apply or self.remove(rel):
+                    self.orphans += 1
+                    self.reclaimed += size
+            if self.apply:
+                cursor.execute(FORGET_MANY_SQL, {"paths": claimed})
+
+    def remove(self, rel):
+        source = self.media_root / rel
+        try:
+            if self.quarantine is None:
+                source.unlink()
+            else:
+                target = self.quarantine / rel
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(source, target)
+        except FileNotFoundError:
+            return False
+        except OSError as exc:
+            self.stderr.write(f"{rel}: {exc}")
+            return False
+        return True
@@ -0,0 +1,104 @@
+"""
+Content-addressed product media, shared by the FastAPI seller API and the
+Django ``ImageField`` storage (``catalog.storage``).
+
+Files are named by the SHA-256 of their bytes and sharded two levels deep::
+
+    products/ab/cd/abcd1234...<64 hex>.jpg
+    products/ab/cd/abcd1234...-thumb.webp      (variants, see catalog.images)
+
+so identical uploads share one file and no directory grows past a few
+hundred entries. ``catalog_mediablob`` counts the image rows pointing at each
+file; the last reference to go unlinks it.
+
+Protocol (both sides), all inside the transaction that writes the image row:
+
+* add: ``RETAIN_SQL`` first -- its row lock serializes against a concurrent
+  release of the same file -- then ``ContentStore.place`` the bytes. The
+  Django storage has to write the file before the row exists, so it locks
+  with ``CLAIM_SQL`` (count unchanged) first and ``post_save`` retains;
+* delete: ``RELEASE_SQL``; if it returns 0 (or no row: files written before
+  this scheme are single-owner), ``FORGET_SQL`` and ``ContentStore.remove``
+  while the lock is still held.
+
+Kept free of Django/SQLAlchemy imports; the SQL uses pyformat parameters.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_NAME = "sha256"
+MEDIA_PREFIX = "products"
+
+# returns the new count; 1 means this call created the blob
+RETAIN_SQL = """
+INSERT INTO catalog_mediablob (path, refcount, created_at)
+VALUES (%(path)s, 1, now())
+ON CONFLICT (path) DO UPDATE SET refcount = catalog_mediablob.refcount + 1
+RETURNING refcount
+"""
+# returns the new count, or no row for files that predate refcounting
+RELEASE_SQL = """
+UPDATE catalog_mediablob SET refcount = refcount - 1
+WHERE path = %(path)s
+RETURNING refcount
+"""
+FORGET_SQL = "DELETE FROM catalog_mediablob WHERE path = %(path)s AND refcount <= 0"
+
+# Media GC (gc_media) and the Django storage: lock the blob rows of candidate
+# paths, creating 0-count rows for unknown ones, and return their counts. An in-flight upload of the
+# same bytes holds its row until commit, so this waits for it and then sees
+# refcount > 0. Paths must be distinct; pair with FORGET_MANY_SQL.
+CLAIM_SQL = """
+INSERT INTO catalog_mediablob (path, refcount, created_at)
+SELECT path, 0, now() FROM unnest(%(paths)s::text[]) AS path ORDER BY path
+ON CONFLICT (path) DO UPDATE SET refcount = catalog_mediablob.refcount
+RETURNING path, refcount
+"""
+FORGET_MANY_SQL = "DELETE FROM catalog_mediablob WHERE path = ANY(%(paths)s) AND refcount <= 0"
+
+
+class ContentStore:
+    """Placement and removal of content-named files under ``root``."""
+
+    def __init__(self, root, prefix: str = MEDIA_PREFIX):
+        self.root = Path(root)
+        self.prefix = prefix.strip("/")
+
+    def path_for(self, digest: str, ext: str) -> str:
+        """Relative path (as stored in ``catalog_productimage.image``)."""
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+    def place(self, tmp_path, rel: str) -> bool:
+        """
+        Move the finished temp file to ``rel``; ``tmp_path`` must be on the same
+        filesystem. If the content is already there the temp file is dropped.
+        Returns whether a new file was written.
+        """
+        target = self.root / rel
+        if target.exists():
+            os.unlink(tmp_path)
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+        return True
+
+    def remove(self, *rels: str) -> None:
+        """
+        Unlink files; never leaves ``root``. Failures are logged, not raised:
+        the DB change still goes through and the media GC picks up leftovers.
+        """
+        root = self.root.resolve()
+        for rel in rels:
+            target = (self.root / rel).resolve()
+            if not target.is_relative_to(root):
+                continue
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.warning("could not remove media file %s", target, exc_info=True)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# 'simple' config: listings are written in Turkmen, Turkish, Russian and
+# English, so no single-language stemmer fits. Title outranks description.
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')
+"""
+
+CREATE_TRIGGER = f"""
+CREATE OR REPLACE FUNCTION catalog_product_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER catalog_product_search_vector_trg
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_vector_update();
+
+UPDATE catalog_product SET search_vector = {SEARCH_VECTOR_SQL.format(row="")};
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trg ON catalog_product;
+DROP FUNCTION IF EXISTS catalog_product_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_product_stock_quantity_status_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='idx_product_search_vector'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def closure_rows(parents):
+    # frozen copy of catalog.models.closure_rows; migrations must not import app code
+    for cat_id in parents:
+        seen = set()
+        node, depth = cat_id, 0
+        while node is not None and node in parents and node not in seen:
+            seen.add(node)
+            yield node, cat_id, depth
+            node, depth = parents[node], depth + 1
+
+
+def build_closure(apps, schema_editor):
+    Category = apps.get_model("catalog", "Category")
+    CategoryClosure = apps.get_model("catalog", "CategoryClosure")
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+    CategoryClosure.objects.bulk_create(
+        CategoryClosure(ancestor_id=a, descendant_id=d, depth=depth)
+        for a, d, depth in closure_rows(parents)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='catalog.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='catalog.category')),
+            ],
+            options={
+                'db_table': 'catalog_category_closure',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='idx_closure_descendant')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='uniq_closure_pair')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    CategoryTreeVersion = apps.get_model("catalog", "CategoryTreeVersion")
+    CategoryTreeVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_category_closure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryTreeVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'catalog_category_version',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:58
+
+import backend.apps.catalog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_media_blob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=backend.apps.catalog.storage.content_storage, upload_to='products/'),
+        ),
+    ]
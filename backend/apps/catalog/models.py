@@ -1,8 +1,13 @@
 # django_app/catalog/models.py
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 
+from .storage import content_storage
+from .slugs import MAX_ATTEMPTS, MAX_SUFFIX_SQL, max_suffix_params, slug_after, trim_base
+
 
 class Category(models.Model):
     name = models.CharField(max_length=120)
@@ -15,7 +20,88 @@ class Category(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+        moved = self._state.adding or (
+            Category.objects.filter(pk=self.pk)
+            .values_list("parent_id", flat=True)
+            .first()
+            != self.parent_id
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if moved:
+                CategoryClosure.rebuild()
+
+
+def closure_rows(parents):
+    """
+    Yield ``(ancestor_id, descendant_id, depth)`` for every category, self
+    included at depth 0, from a ``{id: parent_id}`` mapping. Broken parent
+    chains (cycles, missing parents) stop at the last reachable ancestor.
+    """
+    for cat_id in parents:
+        seen = set()
+        node, depth = cat_id, 0
+        while node is not None and node in parents and node not in seen:
+            seen.add(node)
+            yield node, cat_id, depth
+            node, depth = parents[node], depth + 1
+
+
+class CategoryClosure(models.Model):
+    """
+    Precomputed ancestor/descendant pairs of the category tree.
+
+    Subtree filters become ``category_id IN (descendants of X)`` and
+    breadcrumbs a single indexed read. Rebuilt by ``Category.save`` whenever a
+    category is added or moved; deletes cascade on their own.
+    """
+
+    ancestor = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "catalog_category_closure"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="uniq_closure_pair"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="idx_closure_descendant"),
+        ]
+
+    @classmethod
+    def rebuild(cls):
+        # A few hundred categories at most, so a full rebuild is cheap and
+        # avoids subtree-move bookkeeping.
+        parents = dict(Category.objects.values_list("id", "parent_id"))
+        cls.objects.all().delete()
+        cls.objects.bulk_create(
+            cls(ancestor_id=a, descendant_id=d, depth=depth)
+            for a, d, depth in closure_rows(parents)
+        )
+
+
+class CategoryTreeVersion(models.Model):
+    """
+    Single-row counter bumped on every Category write (see signals.py).
+    The API polls it to know when its cached category tree is stale.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "catalog_category_version"
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F("version") + 1):
+            cls.objects.get_or_create(pk=1, defaults={"version": 1})
 
 
 class Product(models.Model):
@@ -33,23 +119,69 @@ class Product(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="draft")
     is_handmade = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by a database trigger from title + description (see 0003 migration)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # keyset pagination of the public listing: status = 'active' AND id < :last
+            models.Index(fields=["status", "-id"], name="idx_product_status_id"),
+            GinIndex(fields=["search_vector"], name="idx_product_search_vector"),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        # Same allocator as the seller API (see slugs.py)
+        base = trim_base(slugify(self.title))
+        lost = None
+        for attempt in range(MAX_ATTEMPTS):
+            with connection.cursor() as cursor:
+                cursor.execute(MAX_SUFFIX_SQL, max_suffix_params(base))
+                self.slug = slug_after(base, cursor.fetchone()[0], lost, attempt)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as exc:
+                if attempt == MAX_ATTEMPTS - 1 or "slug" not in str(exc):
+                    raise
+                lost = self.slug
 
 
 class ProductImage(models.Model):
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="images"
     )
-    image = models.ImageField(upload_to="products/")
+    # indexed for the media GC's batched "is this file referenced" lookups
+    image = models.ImageField(upload_to="products/", storage=content_storage, db_index=True)
     alt = models.CharField(max_length=120, blank=True)
     position = models.PositiveIntegerField(default=0)
+    # resized copies, see catalog.images: {"thumb": {"webp": ..., "jpeg": ...}}
+    variants = models.JSONField(default=dict, blank=True)
+
+    def save(self, *args, **kwargs):
+        # storage.save locks the blob row and post_save retains it: one
+        # transaction, so the file cannot be released in between (media.py)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.product.title} - Image {self.position}"
+
+
+class MediaBlob(models.Model):
+    """
+    Reference count of a content-addressed media file (see media.py).
+    Written with raw SQL by both the admin (signals.py) and the API.
+    """
+
+    path = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.path} ({self.refcount})"
@@ -0,0 +1,76 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image
+
+from .images import make_variants, variant_paths, variants_exist, variants_for
+from .media import FORGET_SQL, RELEASE_SQL, RETAIN_SQL, ContentStore
+from .models import Category, CategoryTreeVersion, ProductImage
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_tree_version(sender, **kwargs):
+    CategoryTreeVersion.bump()
+
+
+def _retain(path):
+    with connection.cursor() as cursor:
+        cursor.execute(RETAIN_SQL, {"path": path})
+
+
+def _release(path, variants):
+    """Drop one reference; the last one unlinks the file and its variants."""
+    with connection.cursor() as cursor:
+        cursor.execute(RELEASE_SQL, {"path": path})
+        row = cursor.fetchone()
+        if row is not None and row[0] > 0:
+            return
+        cursor.execute(FORGET_SQL, {"path": path})
+    ContentStore(settings.MEDIA_ROOT).remove(path, *variant_paths(variants))
+
+
+@receiver(pre_save, sender=ProductImage)
+def remember_previous_image(sender, instance, **kwargs):
+    instance._previous_image = None
+    if instance.pk:
+        instance._previous_image = (
+            ProductImage.objects.filter(pk=instance.pk)
+            .values_list("image", "variants")
+            .first()
+        )
+
+
+@receiver(post_save, sender=ProductImage)
+def track_image_file(sender, instance, created, **kwargs):
+    """Reference-count the file and give it the same derivatives as API uploads."""
+    if not instance.image:
+        return
+    previous = getattr(instance, "_previous_image", None)
+    if not created and previous and previous[0] == instance.image.name:
+        return
+    _retain(instance.image.name)
+    if previous and previous[0]:
+        _release(*previous)
+
+    variants = variants_for(instance.image.name)
+    media_root = str(settings.MEDIA_ROOT)
+    if not variants_exist(media_root, variants):
+        try:
+            variants = make_variants(media_root, instance.image.name)
+        except (OSError, Image.DecompressionBombError):
+            logger.warning("could not build variants for %s", instance.image.name, exc_info=True)
+            variants = {}
+    ProductImage.objects.filter(pk=instance.pk).update(variants=variants)
+    instance.variants = variants
+
+
+@receiver(post_delete, sender=ProductImage)
+def release_image_file(sender, instance, **kwargs):
+    if instance.image:
+        _release(instance.image.name, instance.variants)
@@ -0,0 +1,102 @@
+"""
+Product slug allocation shared by the Django admin and the FastAPI seller API.
+
+A taken slug gets the next free numeric suffix (``silver-ring``,
+``silver-ring-2``, ``silver-ring-3``, ...). The highest suffix in use is
+found with one query instead of probing ``-2``, ``-3``, ... one round trip at
+a time. Two concurrent creates can still pick the same value, so callers
+insert inside a savepoint and retry on a unique violation.
+
+Kept free of Django/SQLAlchemy imports: both sides run ``MAX_SUFFIX_SQL`` on
+their own psycopg2 connection (pyformat parameters).
+"""
+
+import random
+import re
+
+SLUG_MAX_LENGTH = 200
+# room for "-<suffix>" within catalog_product.slug's 200 characters
+BASE_MAX_LENGTH = SLUG_MAX_LENGTH - 11
+MAX_ATTEMPTS = 8
+
+# The LIKE prefix is served by the varchar_pattern_ops index Django creates
+# for the unique slug column; the regex then drops e.g. "silver-ring-gold".
+MAX_SUFFIX_SQL = """
+SELECT max(
+    CASE WHEN slug = %(base)s THEN 1
+         ELSE CAST(substr(slug, %(start)s) AS bigint)
+    END
+)
+FROM catalog_product
+WHERE slug = %(base)s
+   OR (slug LIKE %(prefix)s AND slug ~ %(pattern)s)
+"""
+
+
+def trim_base(base: str) -> str:
+    return base[:BASE_MAX_LENGTH].strip("-") or "product"
+
+
+def max_suffix_params(base: str) -> dict:
+    like_escaped = base.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+    return {
+        "base": base,
+        "start": len(base) + 2,
+        "prefix": like_escaped + "-%",
+        "pattern": "^" + re.escape(base) + "-[0-9]{1,9}$",
+    }
+
+
+def slug_suffix(slug: str, base: str) -> int:
+    """1 for the bare base, N for ``base-N`` (inverse of ``slug_after``)."""
+    return 1 if slug == base else int(slug[len(base) + 1 :])
+
+
+def slug_after(base: str, max_suffix, lost: str | None = None, attempt: int = 0) -> str:
+    """
+    First free slug given the highest suffix in use (``None``: base is free).
+
+    ``lost`` is a slug this caller just failed to insert on try ``attempt``.
+    The winner may not be committed yet, so never offer it (or anything
+    below it) again, and spread retrying racers over a window that doubles
+    per attempt so they stop colliding with each other.
+    """
+    floor = slug_suffix(lost, base) if lost else None
+    if max_suffix is None and floor is None:
+        return base
+    step = random.randint(1, 2**attempt) if lost else 1
+    return f"{base}-{max(int(max_suffix or 0), floor or 0) + step}"
+
+
+# Batch form for imports: highest suffix per base, one index range scan each.
+# ~>=~ / ~<~ are the varchar_pattern_ops operators, so the range stays
+# indexable with per-row bounds ("-" sorts right before ".").
+MAX_SUFFIXES_SQL = """
+SELECT b.base, m.max_suffix
+FROM unnest(%(bases)s::text[]) AS b(base)
+CROSS JOIN LATERAL (
+    SELECT max(
+        CASE WHEN p.slug = b.base THEN 1
+             ELSE CAST(substr(p.slug, length(b.base) + 2) AS bigint)
+        END
+    ) AS max_suffix
+    FROM catalog_product p
+    WHERE p.slug = b.base
+       OR (p.slug ~>=~ (b.base || '-') AND p.slug ~<~ (b.base || '.')
+           AND substr(p.slug, length(b.base) + 2) ~ '^[0-9]{1,9}$')
+) m
+"""
+
+
+def slugs_after(bases: list[str], max_suffixes: dict) -> list[str]:
+    """
+    One slug per entry of ``bases`` (repeats allowed), continuing from
+    ``max_suffixes`` (base -> highest suffix in use, ``None`` if free).
+    ``max_suffixes`` is advanced in place so later batches keep counting.
+    """
+    slugs = []
+    for base in bases:
+        taken = max_suffixes.get(base)
+        slugs.append(slug_after(base, taken))
+        max_suffixes[base] = int(taken or 0) + 1
+    return slugs
@@ -0,0 +1,44 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+
+from .media import CLAIM_SQL, HASH_NAME, ContentStore
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    ``FileSystemStorage`` that names files by content hash (see media.py), so
+    admin uploads land in the same sharded, deduplicated layout as API ones.
+    The ``upload_to`` directory is kept as the prefix; saving content that is
+    already stored just returns the existing name.
+
+    Must run inside the transaction that saves the image row (see
+    ``ProductImage.save``): the blob row is locked before the file is looked
+    at, and ``post_save`` counts the reference under that same lock.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        digest = hashlib.new(HASH_NAME)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = os.path.split(name)
+        _, ext = os.path.splitext(filename)
+        store = ContentStore(self.location, prefix=directory or "products")
+        name = store.path_for(digest.hexdigest(), ext)
+        # a racing release of these bytes has either unlinked them already
+        # (we write them again) or now waits for our post_save RETAIN
+        with connection.cursor() as cursor:
+            cursor.execute(CLAIM_SQL, {"paths": [name]})
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+def content_storage():
+    # content names are final: a racing writer can only write the same bytes
+    return ContentAddressedStorage(allow_overwrite=True)
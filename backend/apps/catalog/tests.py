@@ -1,3 +1,314 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from . import images
+from .management.commands import gc_media
+from .management.commands.gc_media import owner_candidates
+from .media import CLAIM_SQL, FORGET_MANY_SQL, RETAIN_SQL
+from .models import (
+    Category,
+    CategoryClosure,
+    MediaBlob,
+    Product,
+    ProductImage,
+    closure_rows,
+)
+from .signals import track_image_file
+
+
+class ClosureRowsTests(SimpleTestCase):
+    def test_every_ancestor_with_its_distance(self):
+        parents = {1: None, 2: 1, 3: 2, 4: 1}
+        self.assertEqual(
+            set(closure_rows(parents)),
+            {
+                (1, 1, 0), (2, 2, 0), (3, 3, 0), (4, 4, 0),
+                (1, 2, 1), (2, 3, 1), (1, 3, 2), (1, 4, 1),
+            },
+        )
+
+    def test_broken_chains_stop_at_the_last_reachable_ancestor(self):
+        # 1 <-> 2 is a cycle, 3's parent does not exist
+        parents = {1: 2, 2: 1, 3: 99}
+        self.assertEqual(
+            set(closure_rows(parents)),
+            {(1, 1, 0), (2, 1, 1), (2, 2, 0), (1, 2, 1), (3, 3, 0)},
+        )
+
+
+class CategoryClosureTests(TestCase):
+    def pairs(self):
+        return set(
+            CategoryClosure.objects.values_list("ancestor__name", "descendant__name", "depth")
+        )
+
+    def test_created_categories_get_their_ancestor_rows(self):
+        jewelry = Category.objects.create(name="Jewelry")
+        rings = Category.objects.create(name="Rings", parent=jewelry)
+        Category.objects.create(name="Silver", parent=rings)
+
+        self.assertEqual(self.pairs(), {
+            ("Jewelry", "Jewelry", 0), ("Rings", "Rings", 0), ("Silver", "Silver", 0),
+            ("Jewelry", "Rings", 1), ("Rings", "Silver", 1), ("Jewelry", "Silver", 2),
+        })
+
+    def test_moving_a_category_moves_its_subtree(self):
+        jewelry = Category.objects.create(name="Jewelry")
+        home = Category.objects.create(name="Home")
+        rings = Category.objects.create(name="Rings", parent=jewelry)
+        Category.objects.create(name="Silver", parent=rings)
+
+        rings.parent = home
+        rings.save()
+
+        self.assertEqual(
+            {(a, d, depth) for a, d, depth in self.pairs() if d == "Silver"},
+            {("Silver", "Silver", 0), ("Rings", "Silver", 1), ("Home", "Silver", 2)},
+        )
+
+    def test_renaming_keeps_the_rows(self):
+        jewelry = Category.objects.create(name="Jewelry")
+        Category.objects.create(name="Rings", parent=jewelry)
+        before = set(CategoryClosure.objects.values_list("pk", flat=True))
+
+        jewelry.name = "Jewellery"
+        jewelry.save()
+
+        self.assertEqual(set(CategoryClosure.objects.values_list("pk", flat=True)), before)
+
+    def test_deleting_a_category_drops_its_rows(self):
+        jewelry = Category.objects.create(name="Jewelry")
+        rings = Category.objects.create(name="Rings", parent=jewelry)
+        Category.objects.create(name="Silver", parent=rings)
+
+        rings.delete()
+
+        self.assertEqual(self.pairs(), {("Jewelry", "Jewelry", 0)})
+
+
+class MakeVariantsTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        (self.root / "products").mkdir()
+        Image.new("RGB", (640, 480), "red").save(self.root / "products" / "photo.jpg")
+
+    def test_writes_every_size_and_format(self):
+        variants = images.make_variants(str(self.root), "products/photo.jpg")
+
+        self.assertTrue(images.variants_exist(str(self.root), variants))
+        with Image.open(self.root / variants["thumb"]["webp"]) as thumb:
+            self.assertEqual(thumb.size, (200, 150))
+        with Image.open(self.root / variants["full"]["jpeg"]) as full:
+            self.assertEqual(full.size, (640, 480))  # never upscaled
+
+    def test_failure_midway_removes_what_was_written(self):
+        save = images._save_atomic
+        calls = []
+
+        def fail_on_third(*args):
+            calls.append(args)
+            if len(calls) == 3:
+                raise OSError("disk full")
+            save(*args)
+
+        with mock.patch.object(images, "_save_atomic", fail_on_third):
+            with self.assertRaises(OSError):
+                images.make_variants(str(self.root), "products/photo.jpg")
+
+        self.assertEqual(
+            sorted(p.name for p in (self.root / "products").iterdir()), ["photo.jpg"]
+        )
+
+
+def png_upload(color="red"):
+    out = io.BytesIO()
+    Image.new("RGB", (64, 48), color).save(out, "PNG")
+    return SimpleUploadedFile("photo.png", out.getvalue(), content_type="image/png")
+
+
+class ContentAddressedMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(MEDIA_ROOT=str(self.media_root)))
+        seller = User.objects.create_user("seller")
+        self.product = Product.objects.create(seller=seller, title="Ring", price=5)
+
+    def refcount(self, path):
+        return (
+            MediaBlob.objects.filter(path=path).values_list("refcount", flat=True).first()
+        )
+
+    def files(self):
+        return sorted(
+            p.relative_to(self.media_root).as_posix()
+            for p in self.media_root.rglob("*")
+            if p.is_file()
+        )
+
+    def test_identical_uploads_share_one_counted_file(self):
+        first = ProductImage.objects.create(product=self.product, image=png_upload())
+        second = ProductImage.objects.create(product=self.product, image=png_upload())
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r"^products/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+        self.assertEqual(self.refcount(first.image.name), 2)
+        self.assertEqual(len(self.files()), 1 + 6)
+
+        second.delete()
+        self.assertEqual(self.refcount(first.image.name), 1)
+        self.assertEqual(len(self.files()), 7)
+
+        first.delete()
+        self.assertIsNone(self.refcount(first.image.name))
+        self.assertEqual(self.files(), [])
+
+    def test_replacing_the_file_releases_the_old_one(self):
+        image = ProductImage.objects.create(product=self.product, image=png_upload("red"))
+        old = image.image.name
+
+        image.image = png_upload("blue")
+        image.save()
+
+        self.assertNotEqual(image.image.name, old)
+        self.assertIsNone(self.refcount(old))
+        self.assertEqual(self.refcount(image.image.name), 1)
+        self.assertNotIn(old, self.files())
+
+    def test_legacy_files_without_a_blob_row_are_single_owner(self):
+        # stored before refcounting: the first delete removes the file
+        legacy = self.media_root / "products" / "legacy.png"
+        legacy.parent.mkdir(parents=True)
+        legacy.write_bytes(b"old")
+        image = ProductImage(product=self.product, image="products/legacy.png")
+        post_save.disconnect(track_image_file, sender=ProductImage)
+        try:
+            image.save()
+        finally:
+            post_save.connect(track_image_file, sender=ProductImage)
+
+        image.delete()
+
+        self.assertFalse(legacy.exists())
+        self.assertIsNone(self.refcount("products/legacy.png"))
+
+    def test_claim_locks_without_counting(self):
+        with connection.cursor() as cursor:
+            cursor.execute(CLAIM_SQL, {"paths": ["products/a.png", "products/b.png"]})
+            self.assertEqual(
+                sorted(cursor.fetchall()), [("products/a.png", 0), ("products/b.png", 0)]
+            )
+            cursor.execute(RETAIN_SQL, {"path": "products/a.png"})
+            cursor.execute(CLAIM_SQL, {"paths": ["products/a.png"]})
+            self.assertEqual(cursor.fetchall(), [("products/a.png", 1)])
+            cursor.execute(FORGET_MANY_SQL, {"paths": ["products/a.png", "products/b.png"]})
+
+        self.assertEqual(self.refcount("products/a.png"), 1)
+        self.assertIsNone(self.refcount("products/b.png"))
+
+
+class GcMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(MEDIA_ROOT=str(self.media_root)))
+        self.product = Product.objects.create(
+            seller=User.objects.create_user("seller"), title="Ring", price=5
+        )
+
+    def write(self, rel, age_hours=48):
+        path = self.media_root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 10)
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def reference(self, rel):
+        # a row pointing at an existing file, as legacy admin uploads left them
+        post_save.disconnect(track_image_file, sender=ProductImage)
+        try:
+            ProductImage.objects.create(product=self.product, image=rel)
+        finally:
+            post_save.connect(track_image_file, sender=ProductImage)
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command("gc_media", *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_owner_candidates(self):
+        self.assertEqual(owner_candidates("products/a.jpg"), {"products/a.jpg"})
+        self.assertEqual(
+            owner_candidates("products/a-thumb.webp"),
+            {"products/a-thumb.webp", "products/a.jpg", "products/a.jpeg",
+             "products/a.png", "products/a.webp"},
+        )
+
+    def test_deletes_orphans_and_keeps_referenced_files(self):
+        kept = [
+            self.write("products/gift.jpg"),
+            self.write("products/gift-thumb.webp"),
+            # originals whose own names end like a variant
+            self.write("products/gift-card.jpg"),
+            self.write("products/photo-full.png"),
+            self.write("products/photo-full-thumb.webp"),
+            self.write("products/fresh.jpg", age_hours=1),  # inside the grace period
+        ]
+        orphans = [self.write("products/old.jpg"), self.write("products/old-card.webp")]
+        for rel in ("products/gift.jpg", "products/gift-card.jpg", "products/photo-full.png"):
+            self.reference(rel)
+
+        report = self.gc()
+        self.assertIn("Scanned 8 files: 2 orphans, 20 bytes", report)
+        self.assertTrue(all(p.exists() for p in kept + orphans))  # dry run
+
+        self.gc("--delete")
+        self.assertTrue(all(p.exists() for p in kept))
+        self.assertFalse(any(p.exists() for p in orphans))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_counted_files_are_kept_as_stale(self):
+        stale = self.write("products/counted.jpg")
+        with connection.cursor() as cursor:
+            cursor.execute(RETAIN_SQL, {"path": "products/counted.jpg"})
+
+        report = self.gc("--delete")
+
+        self.assertTrue(stale.exists())
+        self.assertIn("1 unreferenced files kept", report)
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
+
+    def test_quarantine_moves_orphans(self):
+        self.write("products/ab/old.jpg")
+        quarantine = Path(self.enterContext(tempfile.TemporaryDirectory()))
+
+        self.gc("--quarantine", str(quarantine))
+
+        self.assertFalse((self.media_root / "products/ab/old.jpg").exists())
+        self.assertTrue((quarantine / "products/ab/old.jpg").exists())
+
+    def test_files_removed_mid_run_are_skipped(self):
+        gone = self.write("products/gone.jpg")
+        self.write("products/old.jpg")
+        scan = gc_media.scan_files
+
+        def scan_then_remove(directory):
+            entries = list(scan(directory))
+            gone.unlink()
+            return entries
+
+        with mock.patch.object(gc_media, "scan_files", scan_then_remove):
+            report = self.gc("--delete")
+
+        self.assertIn("Scanned 2 files: 1 orphans", report)
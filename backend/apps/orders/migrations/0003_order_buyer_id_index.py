@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('addresses', '0001_initial'),
+        ('orders', '0002_alter_order_options_alter_orderitem_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['buyer', '-id'], name='idx_order_buyer_id'),
+        ),
+    ]
@@ -36,9 +36,16 @@ class Order(models.Model):
     )
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set by the API when placing the order took units off stock_quantity;
+    # only such orders put them back on cancel (older ones never reserved).
+    stock_reserved = models.BooleanField(default=False)
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            # buyer order history: buyer_id = :me AND id < :cursor ORDER BY id DESC
+            models.Index(fields=["buyer", "-id"], name="idx_order_buyer_id"),
+        ]
 
     def recalc_totals(self):
         subtotal = Decimal("0")
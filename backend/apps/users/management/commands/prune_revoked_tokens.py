@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.apps.users.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revoked API tokens that have expired anyway."
+
+    def handle(self, *args, **options):
+        # the API only loads unexpired rows, so these are pure dead weight
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired revoked tokens"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:20
+
+from django.conf import settings
+from django.db import migrations
+
+# auth_user belongs to django.contrib.auth, so the index is plain SQL. The API
+# matches logins and signup duplicates on lower(email) (api/security.py,
+# api/routers/auth.py); without it every email login scans the table.
+CREATE_INDEX = "CREATE INDEX IF NOT EXISTS idx_auth_user_email_lower ON auth_user (lower(email))"
+DROP_INDEX = "DROP INDEX IF EXISTS idx_auth_user_email_lower"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_sellerprofile_location_sellerprofile_phone_number'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, reverse_sql=DROP_INDEX),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:31
+
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auth_user_email_lower_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_id', models.CharField(max_length=64, unique=True)),
+                ('kind', models.CharField(choices=[('refresh', 'Spent refresh token'), ('session', 'Session (refresh-token family)'), ('access', 'Access token')], max_length=16)),
+                ('expires_at', models.DateTimeField()),
+                ('revoked_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revoked_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'users_revoked_token',
+                'indexes': [models.Index(fields=['expires_at'], name='idx_revoked_token_expires'), models.Index(condition=models.Q(('kind', 'refresh'), _negated=True), fields=['id'], name='idx_revoked_token_live')],
+            },
+        ),
+    ]
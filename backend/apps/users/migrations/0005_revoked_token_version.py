@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    RevokedTokenVersion = apps.get_model("users", "RevokedTokenVersion")
+    RevokedTokenVersion.objects.get_or_create(pk=1, defaults={"version": 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_revoked_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedTokenVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'users_revoked_token_version',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
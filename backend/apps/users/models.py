@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Now
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -61,3 +62,63 @@ class SellerProfile(models.Model):
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.shop_name} ({self.user.username})"
+
+
+class RevokedToken(models.Model):
+    """
+    API tokens that must no longer be accepted.
+
+    Spent refresh tokens are only ever looked up through the unique
+    ``token_id`` when someone tries to spend them again. Revoked sessions
+    (refresh-token families) and access tokens are what the API keeps in
+    an in-memory snapshot. Once ``expires_at`` passes the token is rejected
+    anyway, so ``prune_revoked_tokens`` deletes the row.
+    """
+
+    KIND_REFRESH = "refresh"
+    KIND_SESSION = "session"
+    KIND_ACCESS = "access"
+    KIND_CHOICES = [
+        (KIND_REFRESH, "Spent refresh token"),
+        (KIND_SESSION, "Session (refresh-token family)"),
+        (KIND_ACCESS, "Access token"),
+    ]
+
+    # refresh-token jti, session id, or SHA-256 of an access token
+    token_id = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="revoked_tokens",
+    )
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        db_table = "users_revoked_token"
+        indexes = [
+            models.Index(fields=["expires_at"], name="idx_revoked_token_expires"),
+            # the API's snapshot rebuild skips spent refresh tokens
+            models.Index(
+                fields=["id"],
+                name="idx_revoked_token_live",
+                condition=~models.Q(kind="refresh"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.token_id} (user {self.user_id})"
+
+
+class RevokedTokenVersion(models.Model):
+    """
+    Single-row counter the API bumps in every transaction that revokes a
+    session or access token. Its revocation snapshot polls it; unlike
+    ``max(id)`` it moves on every such commit, whatever order they come in.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "users_revoked_token_version"